@@ -2,57 +2,73 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import re
+import gc
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+
+import htu_core
+import htu_metrics
+import htu_ui
+import shared_cache
+import course_query
+import forecast
+import sheet_client
+import snapshot_store
+from htu_core import (
+    DATA_URL,
+    TLC_SHEETS,
+    SCHOOL_STATUS_COUNTS,
+    SEMESTER_DEVELOPED_COUNTS,
+    SEMESTER_ORDER,
+    SHEET_REFRESH_SECONDS,
+    DATA_COLUMNS,
+    LINEAGE_COLUMNS,
+    SEARCH_RESULT_COLUMNS,
+    is_filled,
+    clean_text_value,
+    split_instructors,
+    normalize_semester_label,
+    semester_deadline,
+    get_previous_semester_key,
+    build_course_lineage,
+    get_course_history,
+    is_course_deferred_from_previous_semester,
+    sheet_fingerprint,
+    header_query_url,
+    plan_sheet_url,
+    fetch_column_values,
+    build_data,
+    build_tlc_sessions,
+    school_summary,
+    build_course_index,
+    lookup_course,
+    instructor_assignments,
+    instructor_workload,
+    TASK_COLUMNS,
+    completion_matrix,
+    partial_matrix,
+    weight_vector,
+    progress_scores,
+    PARTIAL_CREDIT,
+    block_completion,
+    instructor_courses,
+    instructor_worked_cells,
+    match_tlc_sessions,
+    tlc_session_status,
+)
 
 st.set_page_config(layout="wide")
+htu_ui.inject_stylesheet()
 
-# ===========================
-# URLs
-# ===========================
-# ===========================
-
-DATA_URL = "https://docs.google.com/spreadsheets/d/1EL31srR2r_CXmSXEjGprdWCH3HByT5HLGFlsEhImBBM/gviz/tq?tqx=out:csv&sheet=2013"
-
-TLC_SHEETS = [
-    "https://docs.google.com/spreadsheets/d/1y7mPQzNxkGXMKqBVEk1X_icALvotanOkL3HL885sMAY/gviz/tq?tqx=out:csv&gid=0",
-    "https://docs.google.com/spreadsheets/d/1Ksh_5KUAyuE_H_rJkf0vDRvSKJxvyt2sYSzDgLwR5Nw/gviz/tq?tqx=out:csv&gid=0",
-    "https://docs.google.com/spreadsheets/d/1bRHPX7vvU49A0Q_WzaKhNwhjqS9ketpEJKU64GLSIuM/gviz/tq?tqx=out:csv&gid=0",
-    "https://docs.google.com/spreadsheets/d/1B5o0uBdFrR-pGT9dxStLorAgWx3XUYyN6I-yiBZlMcc/gviz/tq?tqx=out:csv&gid=0",
-]
 
 # ==========================
-# Helpers
+# Components
 # ==========================
 
-def is_filled(x) -> bool:
-    if x is None or (isinstance(x, float) and pd.isna(x)):
-        return False
-    s = str(x).strip()
-    if s == "":
-        return False
-    if s.lower() in {"nan", "none", "null"}:
-        return False
-    return True
-
-
-def clean_text_value(x) -> str:
-    if x is None or (isinstance(x, float) and pd.isna(x)):
-        return ""
-    s = str(x).strip()
-    if s.lower() in {"nan", "none", "null"}:
-        return ""
-    return s
-
-
-def norm_bool(x) -> bool:
-    if isinstance(x, bool):
-        return x
-    if x is None or (isinstance(x, float) and pd.isna(x)):
-        return False
-    s = str(x).strip().lower()
-    return s in {"true", "yes", "1", "✓", "✔", "✅", "done"}
-
-
 def render_donut_chart(percent: float, key: str, size_px: int = 170):
     pct = 0.0 if pd.isna(percent) else float(percent)
     pct = max(0.0, min(100.0, pct))
@@ -91,406 +107,650 @@ def render_donut_chart(percent: float, key: str, size_px: int = 170):
     st.plotly_chart(fig, use_container_width=True, key=key)
 
 
-def clean_name(name: str) -> str:
-    n = "" if name is None else str(name)
-    n = n.replace("\n", " ").replace("\r", " ").strip()
-    n = re.sub(r"\s+", " ", n)
-    n = n.strip(" ,;")
-    return n
+def render_school_status_box(semester_key: str, school: str):
+    # Special display for SSBS when it is on hold
+    if school == "SSBS" and semester_key == "spring 2025/2026":
+        st.markdown(
+            '<div class="htu-status-wrap"><div class="htu-status exceeded">'
+            '<div class="title">🏆 SSBS Exceeded Its Development Target</div>'
+            "</div></div>",
+            unsafe_allow_html=True,
+        )
+        return
 
+    values = SCHOOL_STATUS_COUNTS.get(semester_key, {}).get(
+        school,
+        {"Planned to develop": 0, "Developed": 0, "Canceled": 0, "Not completed": 0},
+    )
 
-def normalize_person_name(name: str) -> str:
-    n = clean_name(name).lower()
-    n = n.replace("eng.", " ").replace("eng", " ")
-    n = re.sub(r"[^a-z0-9\s]", " ", n)
-    n = re.sub(r"\s+", " ", n).strip()
-    return n
+    st.markdown(
+        '<div class="htu-status-wrap"><div class="htu-status"><div class="title">School Status</div>'
+        f"<div>📌 <b>Planned to develop:</b> {values.get('Planned to develop', 0)}</div>"
+        f"<div>✅ <b>Developed:</b> {values.get('Developed', 0)}</div>"
+        f"<div>❌ <b>Canceled:</b> {values.get('Canceled', 0)}</div>"
+        f"<div>⚠️ <b>Not completed:</b> {values.get('Not completed', 0)}</div>"
+        "</div></div>",
+        unsafe_allow_html=True,
+    )
 
 
-def split_instructors(s: str):
-    if s is None or (isinstance(s, float) and pd.isna(s)):
-        return []
-    txt = str(s).replace("\n", ",")
-    parts = [clean_name(p) for p in txt.split(",")]
-    return [p for p in parts if p and p.lower() not in {"nan", "none", "null"}]
+def render_glowy_note(title: str, body: str, icon: str = "📝"):
+    body = clean_text_value(body)
+    if not body:
+        return
 
+    st.markdown(
+        f'<div class="htu-note"><div class="title">{icon} {title}</div><div class="body">{body}</div></div>',
+        unsafe_allow_html=True,
+    )
 
-def instructor_mentioned_in_cell(cell_value, instructor_name: str) -> bool:
-    if not is_filled(cell_value):
-        return False
-    txt = clean_name(str(cell_value)).lower()
-    inst = clean_name(instructor_name).lower()
-    return inst in txt
 
+def render_deferred_course_notice(previous_semester_label: str, current_semester_label: str):
+    st.markdown(
+        '<div class="htu-deferred"><div class="title">⚠️ Postponed Course Notice</div>'
+        f'<div class="body">This course was initiated during {previous_semester_label}, '
+        f"and its development has continued during {current_semester_label}.</div></div>",
+        unsafe_allow_html=True,
+    )
 
-def compute_progress_percent(row: pd.Series, df_columns: list) -> float:
-    detailed_col = "Detailed Outline"
-    blocks = [f"Block {i}" for i in range(1, 16)]
 
-    do_done = is_filled(row.get(detailed_col, "")) if detailed_col in df_columns else False
-    do_score = 0.20 if do_done else 0.0
+# ==========================
+# Table Rendering
+# ==========================
+# Only the visible slice of a table is sent to the browser, so payload size
+# stays bounded however many courses the sheet grows to.
+
+TABLE_PAGE_SIZES = [25, 50, 100]
+TABLE_ROW_CAP = 30
+
+
+def render_paged_dataframe(df: pd.DataFrame, key: str, column_config: dict = None):
+    total = df.shape[0]
+    page_size = TABLE_PAGE_SIZES[0]
+    page = 1
+
+    if total > TABLE_PAGE_SIZES[0]:
+        c1, c2, c3 = st.columns([1, 1, 2])
+        with c1:
+            page_size = st.selectbox("Rows per page", TABLE_PAGE_SIZES, key=f"{key}_page_size")
+        n_pages = max(1, -(-total // page_size))
+        with c2:
+            page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key=f"{key}_page_{total}_{page_size}")
+        with c3:
+            start = (page - 1) * page_size
+            st.caption(f"Rows {start + 1}–{min(start + page_size, total)} of {total}")
+
+    start = (page - 1) * page_size
+    st.dataframe(
+        df.iloc[start:start + page_size].reset_index(drop=True),
+        column_config=column_config,
+        hide_index=True,
+        use_container_width=True,
+    )
 
-    block_weight = 0.80 / 15.0
-    blocks_score = 0.0
-    for b in blocks:
-        if b in df_columns and is_filled(row.get(b, "")):
-            blocks_score += block_weight
 
-    return (do_score + blocks_score) * 100.0
+def render_capped_table(df: pd.DataFrame, key: str, cap: int = TABLE_ROW_CAP):
+    state_key = f"{key}_row_cap"
+    shown = st.session_state.get(state_key, cap)
+    st.table(df.iloc[:shown])
 
+    if df.shape[0] > shown:
+        st.caption(f"Showing {shown} of {df.shape[0]} rows")
+        if st.button("Show more", key=f"{key}_show_more"):
+            st.session_state[state_key] = shown + cap
+            st.rerun()
 
-def normalize_semester_label(s: str) -> str:
-    s = "" if s is None else str(s).strip().lower()
-    s = s.replace("-", " ")
-    s = re.sub(r"\s+", " ", s)
 
-    replacements = {
-        "spring 24/25": "spring 2024/2025",
-        "spring 2024/25": "spring 2024/2025",
-        "spring 24/2025": "spring 2024/2025",
-        "spring 2024/2025": "spring 2024/2025",
-        "fall 25/26": "fall 2025/2026",
-        "fall 2025/26": "fall 2025/2026",
-        "fall 25/2026": "fall 2025/2026",
-        "fall 2025/2026": "fall 2025/2026",
-        "spring 25/26": "spring 2025/2026",
-        "spring 2025/26": "spring 2025/2026",
-        "spring 25/2026": "spring 2025/2026",
-        "spring 2025/2026": "spring 2025/2026",
-    }
+# ==========================
+# Sheet Fetching
+# ==========================
 
-    return replacements.get(s, s)
+# Sources served from a last-known-good snapshot during this run: url -> as-of
+# datetime, or None when the source failed and no snapshot exists.
+STALE_SOURCES = {}
 
 
-# ==========================
-# Manual School Status Numbers
-# ==========================
-# Replace the dummy numbers below with your real numbers later.
-# The keys should match the normalized semester labels and school names in your sheet.
-SCHOOL_STATUS_COUNTS = {
-    "spring 2024/2025": {
-        "SCI": {"Planned to develop": 6, "Developed": 6, "Canceled": 0, "Not completed": 0},
-        "SET": {"Planned to develop": 6, "Developed": 5, "Canceled": 1, "Not completed": 0},
-        "SBEE": {"Planned to develop": 8, "Developed": 2, "Canceled": 6, "Not completed": 0},
-        "SSBS": {"Planned to develop": 9, "Developed": 7, "Canceled": 2, "Not completed": 0},
-    },
-    "fall 2025/2026": {
-        "SCI": {"Planned to develop": 6, "Developed": 0, "Canceled": 4, "Not completed": 2},
-        "SET": {"Planned to develop": 9, "Developed": 0, "Canceled": 9, "Not completed": 0},
-        "SBEE": {"Planned to develop": 9, "Developed": 0, "Canceled": 0, "Not completed": 1},
-        "SSBS": {"Planned to develop": 7, "Developed": 3, "Canceled": 4, "Not completed": 0},
-    },
-    "spring 2025/2026": {
-        "SCI": {"Planned to develop": 9, "Developed": 5, "Canceled": 2, "Not completed": 2},
-        "SET": {"Planned to develop": 11, "Developed": 2, "Canceled": 3, "Not completed": 6},
-        "SBEE": {"Planned to develop": 7, "Developed": 2, "Canceled": 2, "Not completed": 3},
-        "SSBS": {"Planned to develop": 9, "Developed": 5, "Canceled": 1, "Not completed": 3},
-    },
-}
+@st.cache_resource(ttl=SHEET_REFRESH_SECONDS, show_spinner=False)
+def fetch_live_sheet_bytes(url: str) -> bytes:
+    return htu_core.fetch_live_sheet_bytes(url)
+
+
+def fetch_sheet_bytes(url: str) -> bytes:
+    return htu_core.fetch_sheet_bytes(url, STALE_SOURCES, fetch_live_sheet_bytes)
+
+
+def render_stale_data_notice(container):
+    if not STALE_SOURCES:
+        return
+
+    as_of = [t for t in STALE_SOURCES.values() if t is not None]
+    with container.container():
+        if as_of:
+            st.warning(
+                f"⚠️ Google Sheets is not responding. Showing data as of "
+                f"{min(as_of):%Y-%m-%d %H:%M} UTC."
+            )
+        if len(as_of) < len(STALE_SOURCES):
+            st.warning("⚠️ Some sheets could not be loaded and have no saved copy; figures may be incomplete.")
 
 
 # ==========================
-# Manual Semester Developed Counts
+# Load Courses Data
 # ==========================
-# Replace these dummy numbers with the correct numbers later.
-SEMESTER_DEVELOPED_COUNTS = {
-    "spring 2024/2025": {"developed": 20, "total": 29},
-    "fall 2025/2026": {"developed": 3, "total": 31},
-    "spring 2025/2026": {"developed": 9, "total": 27},
-}
+# Loaders use st.cache_resource: one in-memory dataset per process, handed to
+# every session by reference instead of a pickled copy per caller.
+# Treat the returned objects as read-only.
 
-SEMESTER_ORDER = [
-    "spring 2024/2025",
-    "fall 2025/2026",
-    "spring 2025/2026",
-]
+PROGRESS_COLUMN = st.column_config.NumberColumn(format="%.1f%%")
 
+def get_data_version(semester_keys: tuple = None, columns: tuple = None) -> str:
+    url = plan_sheet_url(DATA_URL, columns or DATA_COLUMNS, semester_keys, fetch_sheet_bytes)
+    return sheet_fingerprint(fetch_sheet_bytes(url))
 
-def normalize_course_name(name: str) -> str:
-    n = clean_text_value(name).lower()
-    n = n.replace("\u00a0", " ")
-    n = n.replace("&", "and")
-    n = re.sub(r"[^a-z0-9\s]", " ", n)
-    n = re.sub(r"\s+", " ", n).strip()
-    return n
 
+def load_data(semester_keys: tuple = None, columns: tuple = None):
+    htu_metrics.CACHE_REQUESTS.inc(cache="courses")
+    url = plan_sheet_url(DATA_URL, columns or DATA_COLUMNS, semester_keys, fetch_sheet_bytes)
+    raw = fetch_sheet_bytes(url)
+    return process_data(url, sheet_fingerprint(raw), raw)
 
-def get_previous_semester_key(current_semester_key: str):
-    if current_semester_key not in SEMESTER_ORDER:
-        return None
-    idx = SEMESTER_ORDER.index(current_semester_key)
-    if idx == 0:
-        return None
-    return SEMESTER_ORDER[idx - 1]
 
+@st.cache_resource(max_entries=8, show_spinner=False)
+def process_data(url: str, version: str, _raw: bytes):
+    htu_metrics.CACHE_MISSES.inc(cache="courses")
+    return shared_cache.get_or_build_frame(f"frame:{url}", version, lambda: build_data(url, _raw))
 
-def is_course_deferred_from_previous_semester(df_all: pd.DataFrame, current_semester_key: str, course_name: str) -> bool:
-    previous_key = get_previous_semester_key(current_semester_key)
-    if previous_key is None:
-        return False
 
-    current_course_key = normalize_course_name(course_name)
-    previous_courses = df_all[df_all["__semester_key__"] == previous_key]["Course \\ pathway"].apply(normalize_course_name)
-    return current_course_key in set(previous_courses)
+def load_course_lineage():
+    htu_metrics.CACHE_REQUESTS.inc(cache="lineage")
+    return process_course_lineage(get_data_version(columns=tuple(LINEAGE_COLUMNS)))
 
 
-def render_school_status_box(semester_key: str, school: str):
-    # Special display for SSBS when it is on hold
-    if school == "SSBS" and semester_key == "spring 2025/2026":
-        st.markdown(
-            """
-            <div style="text-align:center; margin-top:6px;">
-                <div style="
-                    background:linear-gradient(135deg, rgba(0, 128, 0,0.65), rgba(0, 128, 0,0.35));
-                    border:1px solid rgba(255,120,120,0.85);
-                    border-left:5px solid #ff4d4d;
-                    border-radius:10px;
-                    padding:10px 14px;
-                    color:white;
-                    font-size:13px;
-                    line-height:1.45;
-                    display:inline-block;
-                    width:fit-content;
-                    text-align:left;
-                ">
-                    <div style="
-                        font-weight:800;
-                        font-size:14px;
-                        color:#ffffff;
-                        text-shadow:0 0 8px rgba(255,120,120,0.85);
-                    ">
-                        🏆 SSBS Exceeded Its Development Target
-                    </div>
-                </div>
-            </div>
-            """,
-            unsafe_allow_html=True,
+@st.cache_resource(max_entries=2, show_spinner=False)
+def process_course_lineage(version: str):
+    htu_metrics.CACHE_MISSES.inc(cache="lineage")
+    return build_course_lineage(load_data(columns=tuple(LINEAGE_COLUMNS)))
+
+
+@st.cache_resource(max_entries=8)
+def load_school_summary(semester_key: str, version: str, _df: pd.DataFrame):
+    with htu_metrics.INDEX_BUILD_SECONDS.time(index="school_summary"):
+        return school_summary(_df)
+
+
+@st.cache_resource(max_entries=8)
+def load_course_index(semester_key: str, version: str, _df: pd.DataFrame):
+    with htu_metrics.INDEX_BUILD_SECONDS.time(index="course_key"):
+        return build_course_index(_df)
+
+
+def render_duplicate_courses(duplicates: pd.DataFrame, key: str):
+    if duplicates.empty:
+        return
+    with st.expander(f"⚠️ Data Quality: {len(duplicates)} duplicated course keys"):
+        st.caption("Rows sharing semester, school, department and course name. Detail views show the first row.")
+        render_paged_dataframe(
+            duplicates.assign(semester=duplicates["semester"].str.title()).rename(columns={
+                "semester": "Semester",
+                "school": "School",
+                "department": "Department",
+                "course": "Course",
+                "copies": "Rows",
+                "progress": "Progress of Each Row",
+            }),
+            key=key,
         )
+
+
+# ==========================
+# Progress History
+# ==========================
+
+@st.cache_resource(ttl=SHEET_REFRESH_SECONDS, max_entries=8)
+def load_progress_history(semester_key: str, version: str):
+    return snapshot_store.progress_trend(semester_key), snapshot_store.burndown(semester_key)
+
+
+def render_progress_history(semester_key: str, key_prefix: str):
+    trend, remaining = load_progress_history(
+        semester_key, get_data_version(semester_keys=(semester_key,))
+    )
+    if len(trend) < 2:
         return
 
-    values = SCHOOL_STATUS_COUNTS.get(semester_key, {}).get(
-        school,
-        {"Planned to develop": 0, "Developed": 0, "Canceled": 0, "Not completed": 0},
+    st.subheader("📈 Progress Trend")
+    fig = go.Figure()
+    for col in trend.columns:
+        fig.add_trace(go.Scatter(
+            x=trend.index, y=trend[col], mode="lines+markers", name=col,
+            line=dict(width=4 if col == "Overall" else 2),
+        ))
+    fig.update_layout(
+        height=320, margin=dict(l=10, r=10, t=10, b=10),
+        yaxis=dict(title="Progress %", range=[0, 100]),
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
     )
+    st.plotly_chart(fig, use_container_width=True, key=f"{key_prefix}-trend")
 
-    st.markdown(
-        f"""
-        <div style="text-align:center; margin-top:6px;">
-            <div style="
-                background:#202020;
-                border:1px solid rgba(255,255,255,0.12);
-                border-left:5px solid #d04546;
-                border-radius:10px;
-                padding:8px 12px;
-                color:white;
-                box-shadow:0 4px 12px rgba(0,0,0,0.25);
-                font-size:13px;
-                line-height:1.45;
-                display:inline-block;
-                width:fit-content;
-                text-align:left;
-            ">
-                <div style="font-weight:700; font-size:14px; margin-bottom:4px; color:#ffffff;">School Status</div>
-                <div>📌 <b>Planned to develop:</b> {values.get('Planned to develop', 0)}</div>
-                <div>✅ <b>Developed:</b> {values.get('Developed', 0)}</div>
-                <div>❌ <b>Canceled:</b> {values.get('Canceled', 0)}</div>
-                <div>⚠️ <b>Not completed:</b> {values.get('Not completed', 0)}</div>
-            </div>
-        </div>
-        """,
-        unsafe_allow_html=True,
+    st.subheader("🔥 Tasks Burndown")
+    fig = go.Figure(go.Scatter(
+        x=remaining.index, y=remaining.values, mode="lines+markers", fill="tozeroy",
+        line=dict(color="#d04546", width=3),
+    ))
+    fig.update_layout(
+        height=280, margin=dict(l=10, r=10, t=10, b=10),
+        yaxis=dict(title="Open outline/block tasks", rangemode="tozero"),
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
     )
+    st.plotly_chart(fig, use_container_width=True, key=f"{key_prefix}-burndown")
 
 
-def render_glowy_note(title: str, body: str, icon: str = "📝"):
-    body = clean_text_value(body)
-    if not body:
+@st.cache_resource(ttl=SHEET_REFRESH_SECONDS, max_entries=8)
+def load_semester_forecast(semester_key: str, version: str):
+    return forecast.forecast_semester(semester_key, semester_deadline(semester_key))
+
+
+def render_semester_forecast(semester_key: str, key_prefix: str):
+    result = load_semester_forecast(semester_key, get_data_version(semester_keys=(semester_key,)))
+    schools = result["schools"]
+    if schools.empty or (schools["status"] == forecast.STATUS_UNKNOWN).all():
         return
 
-    st.markdown(
-        f"""
-        <div style="
-            background:linear-gradient(135deg, rgba(208,69,70,0.24), rgba(255,255,255,0.07));
-            border:1px solid rgba(255,115,115,0.75);
-            border-left:8px solid #d04546;
-            border-radius:16px;
-            padding:16px 18px;
-            margin:12px 0;
-            color:white;
-            box-shadow:0 0 18px rgba(208,69,70,0.55);
-        ">
-            <div style="font-size:19px; font-weight:900; color:#ffdddd; text-shadow:0 0 10px rgba(255,120,120,0.85); margin-bottom:8px;">
-                {icon} {title}
-            </div>
-            <div style="font-size:15px; font-weight:600; line-height:1.6; color:#ffffff;">
-                {body}
-            </div>
-        </div>
-        """,
-        unsafe_allow_html=True,
+    deadline = semester_deadline(semester_key)
+    st.subheader("🔮 Completion Forecast")
+    if deadline:
+        st.caption(f"Projected from the last {forecast.FORECAST_WINDOW_DAYS} days of progress; deadline {deadline}.")
+    else:
+        st.caption(f"Projected from the last {forecast.FORECAST_WINDOW_DAYS} days of progress; no deadline set.")
+
+    school_table = schools.rename(columns={
+        "school": "School",
+        "courses": "Courses",
+        "progress": "Progress",
+        "rate_per_week": "Rate / Week",
+        "expected_finish": "Expected Finish",
+        "status": "Status",
+        "at_risk": "At-Risk Courses",
+    })
+    st.dataframe(
+        school_table,
+        hide_index=True,
+        column_config={
+            "Progress": PROGRESS_COLUMN,
+            "Rate / Week": st.column_config.NumberColumn(format="%.1f pts"),
+            "Expected Finish": st.column_config.DateColumn(format="YYYY-MM-DD"),
+        },
     )
 
-
-def render_deferred_course_notice(previous_semester_label: str, current_semester_label: str):
-    st.markdown(
-        f"""
-        <div style="
-            background:linear-gradient(90deg, rgba(255,193,7,0.22), rgba(208,69,70,0.18));
-            border:1px solid rgba(255,193,7,0.8);
-            border-left:8px solid #ffc107;
-            border-radius:16px;
-            padding:15px 18px;
-            margin:12px 0 18px 0;
-            color:white;
-            box-shadow:0 0 16px rgba(255,193,7,0.35);
-        ">
-            <div style="font-size:18px; font-weight:900; color:#fff3cd; margin-bottom:5px;">
-                ⚠️ Postponed Course Notice
-            </div>
-            <div style="font-size:15px; font-weight:650; line-height:1.6;">
-                This course was initiated during {previous_semester_label}, and its development has continued during {current_semester_label}.
-            </div>
-        </div>
-        """,
-        unsafe_allow_html=True,
+    at_risk = result["courses"][result["courses"]["at_risk"]]
+    if at_risk.empty:
+        return
+    st.markdown(f"**⚠️ At-Risk Courses ({at_risk.shape[0]})**")
+    at_risk_table = (
+        at_risk[["school", "course", "progress", "rate_per_week", "expected_finish", "status"]]
+        .rename(columns={
+            "school": "School",
+            "course": "Course",
+            "progress": "Progress",
+            "rate_per_week": "Rate / Week",
+            "expected_finish": "Expected Finish",
+            "status": "Status",
+        })
+        .sort_values(["School", "Course"])
+        .reset_index(drop=True)
+    )
+    render_paged_dataframe(
+        at_risk_table,
+        key=f"{key_prefix}_at_risk",
+        column_config={
+            "Progress": PROGRESS_COLUMN,
+            "Rate / Week": st.column_config.NumberColumn(format="%.1f pts"),
+            "Expected Finish": st.column_config.DateColumn(format="YYYY-MM-DD"),
+        },
     )
 
 
 # ==========================
-# Load Courses Data
+# Load TLC Sessions Data
 # ==========================
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv(DATA_URL)
-    df.columns = df.columns.astype(str).str.strip()
-
-    for possible in [
-        "Course \\ pathway",
-        "Course \\\\ pathway",
-        "Course / pathway",
-        "Course pathway",
-        "Course \\pathway",
-        "Course  pathway",
-    ]:
-        if possible in df.columns and possible != "Course \\ pathway":
-            df = df.rename(columns={possible: "Course \\ pathway"})
-
-    base_text_cols = [
-        "Semester",
-        "School",
-        "Department",
-        "Course \\ pathway",
-        "Development Stage",
-        "Dept. Head",
-        "SMEs",
-        "ID",
-    ]
-    for col in base_text_cols:
-        if col not in df.columns:
-            df[col] = ""
-
-    if "Detailed Outline" not in df.columns:
-        df["Detailed Outline"] = ""
-
-    for i in range(1, 16):
-        c = f"Block {i}"
-        if c not in df.columns:
-            df[c] = ""
+def fetch_tlc_raws():
+    raws = []
+    for url in TLC_SHEETS:
+        try:
+            raws.append((url, fetch_sheet_bytes(url)))
+        except Exception:
+            continue
 
-    if "Notes" not in df.columns:
-        df["Notes"] = ""
+    version = sheet_fingerprint("".join(sheet_fingerprint(raw) for _, raw in raws).encode())
+    return version, raws
 
-    text_cols = [
-        "Semester",
-        "School",
-        "Department",
-        "Course \\ pathway",
-        "Development Stage",
-        "Dept. Head",
-        "SMEs",
-        "ID",
-        "Detailed Outline",
-        "Notes",
-    ] + [f"Block {i}" for i in range(1, 16)]
 
-    for c in text_cols:
-        if c in df.columns:
-            df[c] = df[c].fillna("").astype(str).str.strip()
-            df[c] = df[c].replace({"nan": "", "None": "", "null": "", "NaN": ""})
+def load_tlc_sessions():
+    htu_metrics.CACHE_REQUESTS.inc(cache="tlc")
+    return process_tlc_sessions(*fetch_tlc_raws())
 
-    df["Progress %"] = df.apply(lambda r: compute_progress_percent(r, df.columns.tolist()), axis=1)
-    df["__semester_key__"] = df["Semester"].apply(normalize_semester_label)
 
-    return df
+@st.cache_resource(max_entries=2, show_spinner=False)
+def process_tlc_sessions(version: str, _raws: list):
+    htu_metrics.CACHE_MISSES.inc(cache="tlc")
+    return shared_cache.get_or_build_frame("frame:tlc", version, lambda: build_tlc_sessions(_raws))
 
 
 # ==========================
-# Load TLC Sessions Data
+# Cache Warmer and Live Refresh
 # ==========================
-
-@st.cache_data
-def load_tlc_sessions():
-    frames = []
+# One daemon thread per process keeps every loader warm so visitors never pay
+# for a cold fetch. The replica holding the "warmer" lock polls the courses
+# header, the full courses view and the TLC sheets every WARM_INTERVAL_SECONDS
+# (plus up to WARM_JITTER_SECONDS, so replicas do not poll in lockstep) and
+# rewrites a shared-cache entry only when its SHA-256 changed. The other
+# projections of the courses sheet (lineage columns, one per semester) are
+# not polled: when the header or full view changed they are expired, and the
+# first loader that needs one downloads it again. Every replica compares the
+# polled digests in the shared cache with the ones it last built from, and
+# only on a change drops its in-process copies, rebuilds its loaders and
+# bumps the live generation. Concurrent cold loads are already
+# single-flighted by the per-entry locks in shared_cache.
+#
+# Open sessions check the generation from a small fragment every
+# LIVE_REFRESH_SECONDS and rerun the page only when it moved (0 turns this
+# off).
+#
+# The warmer thread belongs to no session, so the cached loaders it calls
+# are declared with show_spinner=False and Streamlit's "missing
+# ScriptRunContext" warning is filtered for that thread only.
+
+WARM_INTERVAL_SECONDS = float(os.environ.get("HTU_WARM_INTERVAL_SECONDS", 60))
+WARM_JITTER_SECONDS = float(os.environ.get("HTU_WARM_JITTER_SECONDS", 10))
+LIVE_REFRESH_SECONDS = float(os.environ.get("HTU_LIVE_REFRESH_SECONDS", 15))
+WARMER_THREAD_NAME = "htu-cache-warmer"
+
+
+class WarmerContextFilter(logging.Filter):
+    def filter(self, record) -> bool:
+        return WARMER_THREAD_NAME not in record.getMessage()
+
+
+def polled_urls(fetch=fetch_sheet_bytes) -> list:
+    return [header_query_url(DATA_URL), plan_sheet_url(DATA_URL, DATA_COLUMNS, fetch=fetch)] + TLC_SHEETS
+
+
+def derived_urls(fetch=fetch_sheet_bytes) -> list:
+    urls = [plan_sheet_url(DATA_URL, tuple(LINEAGE_COLUMNS), fetch=fetch)]
+    return urls + [plan_sheet_url(DATA_URL, DATA_COLUMNS, (key,), fetch) for key in SEMESTER_ORDER]
+
+
+def poll_shared_sheet(url: str, changed: list) -> bytes:
+    raw = sheet_client.fetch_bytes(url)
+    with shared_cache.locked(url):
+        if shared_cache.put_bytes_if_changed(url, raw):
+            changed.append(url)
+    return raw
+
+
+def refresh_shared_sheets() -> list:
+    # Polls the header, full courses view and TLC sheets; returns the urls
+    # whose content changed. The courses queries are planned against the
+    # header just downloaded, not a cached copy.
+    changed = []
+    try:
+        header = poll_shared_sheet(header_query_url(DATA_URL), changed)
+
+        def planned(url):
+            return header
+
+        poll_shared_sheet(plan_sheet_url(DATA_URL, DATA_COLUMNS, fetch=planned), changed)
+        if changed:
+            for url in derived_urls(planned):
+                with shared_cache.locked(url):
+                    shared_cache.expire_bytes(url)
+    except Exception:
+        pass
 
     for url in TLC_SHEETS:
         try:
-            d = pd.read_csv(url)
+            poll_shared_sheet(url, changed)
         except Exception:
             continue
+    return changed
 
-        d.columns = d.columns.astype(str).str.strip()
 
-        name_col = None
-        for c in d.columns:
-            if c.strip().lower() in {"instructor name", "istructor name", "instructor", "name"}:
-                name_col = c
-                break
+def shared_sheets_version() -> str:
+    digests = [shared_cache.bytes_digest(url) or "" for url in polled_urls()]
+    return sheet_fingerprint("|".join(digests).encode())
 
-        if name_col is None:
-            name_col = d.columns[0]
 
-        d = d.rename(columns={name_col: "Instructor Name"})
+def warm_caches():
+    load_data()
+    for key in SEMESTER_ORDER:
+        load_data(semester_keys=(key,))
+    load_course_lineage()
+    load_tlc_sessions()
 
-        for c in d.columns:
-            if c == "Instructor Name":
-                continue
-            d[c] = d[c].apply(norm_bool)
 
-        d["__name_key__"] = d["Instructor Name"].apply(normalize_person_name)
-        frames.append(d)
+@st.cache_resource(show_spinner=False)
+def live_state() -> dict:
+    return {"generation": 0}
 
-    if not frames:
-        return pd.DataFrame(columns=["Instructor Name", "__name_key__"])
 
-    all_df = pd.concat(frames, ignore_index=True)
+@st.cache_resource
+def start_cache_warmer():
+    def run():
+        leader = None
+        built = None
+        while True:
+            if leader is None:
+                leader = shared_cache.try_lock("warmer")
+            try:
+                if leader is not None:
+                    refresh_shared_sheets()
+                version = shared_sheets_version()
+                if version != built:
+                    fetch_live_sheet_bytes.clear()
+                    warm_caches()
+                    if built is not None:
+                        live_state()["generation"] += 1
+                    built = version
+            except Exception:
+                pass
+            time.sleep(WARM_INTERVAL_SECONDS + random.uniform(0, WARM_JITTER_SECONDS))
+
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(WarmerContextFilter())
+    thread = threading.Thread(target=run, name=WARMER_THREAD_NAME, daemon=True)
+    thread.start()
+    return thread
+
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS or None)
+def watch_live_generation():
+    if live_state()["generation"] != st.session_state.get("live_generation"):
+        st.rerun()
+
+
+# ==========================
+# Metrics Exporter
+# ==========================
+# Prometheus text on 127.0.0.1:HTU_METRICS_PORT (0 turns it off). Replicas on
+# one host each need their own port; a replica that cannot bind goes without.
+#
+# Sessions are counted by a marker object each one keeps in session_state and
+# a process-wide WeakSet of the markers. A session drops out once Streamlit
+# disposes of its state: disconnected sessions are kept for
+# server.disconnectedSessionTTL and evicted at the next session connect or
+# disconnect after that. Disposed sessions sit in reference cycles, so a
+# scrape runs the garbage collector before counting.
+
+METRICS_PORT = int(os.environ.get("HTU_METRICS_PORT", 9108))
+
+
+class SessionMarker:
+    pass
+
+
+@st.cache_resource(show_spinner=False)
+def session_markers() -> weakref.WeakSet:
+    return weakref.WeakSet()
 
-    session_cols = [
-        c for c in all_df.columns
-        if c not in {"Instructor Name", "__name_key__"}
-        and str(c).strip() != ""
-        and not str(c).strip().lower().startswith("unnamed")
-    ]
 
-    def first_non_empty(values):
-        for v in values:
-            if is_filled(v):
-                return v
-        return values[0] if values else ""
+def track_session():
+    if "metrics_session" not in st.session_state:
+        st.session_state["metrics_session"] = SessionMarker()
+        session_markers().add(st.session_state["metrics_session"])
+
+
+@st.cache_resource
+def start_metrics_server():
+    markers = session_markers()
+
+    def session_count() -> int:
+        gc.collect()
+        return len(markers)
+
+    htu_metrics.ACTIVE_SESSIONS.set_function(session_count)
+    if METRICS_PORT <= 0:
+        return None
+    try:
+        return htu_metrics.start_server(port=METRICS_PORT)
+    except OSError:
+        return None
 
-    grouped = all_df.groupby("__name_key__", dropna=False)
-    out_rows = []
 
-    for key, g in grouped:
-        row = {
-            "__name_key__": key,
-            "Instructor Name": first_non_empty(g["Instructor Name"].tolist()),
+# ==========================
+# Block Bottlenecks
+# ==========================
+# The courses x tasks completion matrix is built once per data version; the
+# school and department heatmaps are reductions of it.
+
+TASK_LABELS = ["Outline"] + [f"B{i}" for i in range(1, 16)]
+
+
+@st.cache_resource(max_entries=8)
+def load_block_completion(semester_key: str, version: str, _df: pd.DataFrame):
+    with htu_metrics.INDEX_BUILD_SECONDS.time(index="completion"):
+        matrix = completion_matrix(_df)
+        return {
+            "matrix": matrix,
+            "partial": partial_matrix(_df),
+            "schools": block_completion(_df, matrix, ["School"]),
+            "departments": block_completion(_df, matrix, ["School", "Department"]),
         }
-        for c in session_cols:
-            row[c] = bool(g[c].fillna(False).astype(bool).any())
-        out_rows.append(row)
 
-    return pd.DataFrame(out_rows)
+
+def render_completion_heatmap(table: pd.DataFrame, key: str):
+    fig = go.Figure(go.Heatmap(
+        z=table[TASK_COLUMNS].to_numpy(),
+        x=TASK_LABELS,
+        y=[f"{name} ({n})" for name, n in zip(table.index, table["Courses"])],
+        zmin=0,
+        zmax=100,
+        colorscale=[[0.0, "#2b2b2b"], [1.0, "#d04546"]],
+        colorbar=dict(title="% done"),
+        hovertemplate="%{y}<br>%{x}: %{z:.0f}% done<extra></extra>",
+    ))
+    fig.update_layout(
+        height=120 + 38 * len(table),
+        margin=dict(l=10, r=10, t=10, b=10),
+        yaxis=dict(autorange="reversed"),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+    )
+    st.plotly_chart(fig, use_container_width=True, key=key)
+
+
+def render_bottlenecks_page(df: pd.DataFrame, semester_label: str, target_semester: str, key_prefix: str):
+    st.subheader(f"{semester_label} – Block Bottlenecks")
+    completion = load_block_completion(
+        target_semester, get_data_version(semester_keys=(target_semester,)), df
+    )
+
+    schools = completion["schools"]
+    school = st.sidebar.selectbox("Drill into School", ["All Schools"] + list(schools.index), key=f"{key_prefix}_bn_school")
+    if school == "All Schools":
+        st.caption("Share of courses with each task done, by school.")
+        render_completion_heatmap(schools, key=f"{key_prefix}-bn-schools")
+        return
+
+    departments = completion["departments"].loc[school]
+    st.caption(f"Share of {school} courses with each task done, by department.")
+    render_completion_heatmap(departments, key=f"{key_prefix}-bn-{school}")
+
+    dept = st.sidebar.selectbox("Drill into Department", list(departments.index), key=f"{key_prefix}_bn_dept")
+    task = st.sidebar.selectbox("Task", TASK_COLUMNS, key=f"{key_prefix}_bn_task")
+
+    in_dept = ((df["School"] == school) & (df["Department"] == dept)).to_numpy()
+    missing = in_dept & ~completion["matrix"][:, TASK_COLUMNS.index(task)]
+    st.markdown(f"**{dept}: courses with {task} not done ({int(missing.sum())} of {int(in_dept.sum())})**")
+    render_paged_dataframe(
+        df.loc[missing, ["Course \\ pathway", "SMEs", "Development Stage", "Progress %"]].rename(columns={
+            "Course \\ pathway": "Course",
+            "SMEs": "Instructors",
+            "Progress %": "Course Progress",
+        }),
+        key=f"{key_prefix}_bn_missing",
+        column_config={"Course Progress": PROGRESS_COLUMN},
+    )
+
+
+# ==========================
+# What-if Progress Weighting
+# ==========================
+# Progress % under other task weights is the same matrix-vector product as
+# the sheet's own Progress %, run on the cached completion matrix; results
+# are memoized per (weights, partial credit) so moving back to a setting
+# is free.
+
+@st.cache_resource(max_entries=32)
+def what_if_progress(semester_key: str, version: str, weights: tuple, partial_credit: float, _df: pd.DataFrame):
+    completion = load_block_completion(semester_key, version, _df)
+    scores = progress_scores(completion["matrix"], completion["partial"], np.array(weights), partial_credit)
+    table = pd.DataFrame({
+        "School": _df["School"].to_numpy(),
+        "Current": _df["Progress %"].to_numpy(dtype=float),
+        "What-if": scores,
+    }).groupby("School").mean()
+    table["Change"] = table["What-if"] - table["Current"]
+    return {"schools": table, "overall": float(scores.mean()) if len(scores) else 0.0}
+
+
+def render_what_if_weighting(df: pd.DataFrame, target_semester: str, key_prefix: str):
+    with st.expander("⚖️ What-if Progress Weighting"):
+        st.caption("Change how much each task counts toward Progress %. Weights are normalized to 100%.")
+        edited = st.data_editor(
+            pd.DataFrame({"Task": TASK_COLUMNS, "Weight %": weight_vector() * 100}),
+            column_config={"Weight %": st.column_config.NumberColumn(min_value=0.0, format="%.2f")},
+            disabled=["Task"],
+            hide_index=True,
+            key=f"{key_prefix}_whatif_weights",
+        )
+        partial_credit = st.slider(
+            "Credit for tasks marked in progress",
+            0.0, 1.0, PARTIAL_CREDIT, 0.05,
+            key=f"{key_prefix}_whatif_partial",
+        )
+
+        weights = weight_vector(dict(zip(edited["Task"], edited["Weight %"].fillna(0.0))))
+        if not weights.any():
+            st.info("Give at least one task a weight.")
+            return
+
+        result = what_if_progress(
+            target_semester,
+            get_data_version(semester_keys=(target_semester,)),
+            tuple(np.round(weights, 6)),
+            float(partial_credit),
+            df,
+        )
+        st.write(f"What-if Overall Completion: {result['overall']:.1f}%")
+        st.dataframe(
+            result["schools"],
+            column_config={
+                "Current": PROGRESS_COLUMN,
+                "What-if": PROGRESS_COLUMN,
+                "Change": st.column_config.NumberColumn(format="%+.1f"),
+            },
+            use_container_width=True,
+        )
 
 
 # ==========================
@@ -499,36 +759,32 @@ def load_tlc_sessions():
 
 def render_semester_page(df_all: pd.DataFrame, semester_label: str, view: str, key_prefix: str):
     target_semester = normalize_semester_label(semester_label)
-    df = df_all[df_all["__semester_key__"] == target_semester].copy()
+    df = df_all[df_all["__semester_key__"] == target_semester]
 
     if df.empty:
         st.warning(f"No data found for {semester_label}.")
         st.write("Available semester values found in sheet:")
-        st.write(sorted(df_all["Semester"].astype(str).dropna().unique()))
+        # The page only loaded its own semester, so list the sheet's values.
+        st.write(fetch_column_values(DATA_URL, "Semester", fetch_sheet_bytes))
         return
 
     if view == "Overview":
         st.markdown(f"<h3>{semester_label}</h3>", unsafe_allow_html=True)
         st.subheader("🎯 Course Progress by School")
 
-        schools = df["School"].dropna().unique()
-        if len(schools) == 0:
+        summary = load_school_summary(target_semester, get_data_version(semester_keys=(target_semester,)), df)
+        if summary.empty:
             st.info("No schools found.")
         else:
-            cols = st.columns(len(schools))
-            for i, school in enumerate(schools):
+            cols = st.columns(len(summary))
+            for i, (school, stats) in enumerate(summary.iterrows()):
                 with cols[i]:
-                    s_df = df[df["School"] == school]
-                    avg = s_df["Progress %"].mean()
-                    course_count = s_df.shape[0]
+                    avg = stats["avg_progress"]
+                    course_count = int(stats["courses"])
 
                     st.markdown(
-                        f"""
-                        <div style='text-align:center; margin-bottom:-10px;'>
-                          <p style='font-size:18px; font-weight:700; color:white; margin:0;'>{school}</p>
-                          <p style='font-size:13px; color:#cccccc; margin:0 0 6px 0;'>{course_count} Courses</p>
-                        </div>
-                        """,
+                        f'<div class="htu-donut-head"><p class="name">{school}</p>'
+                        f'<p class="sub">{course_count} Courses</p></div>',
                         unsafe_allow_html=True,
                     )
                     render_donut_chart(avg, key=f"{key_prefix}-donut-{i}-{school}")
@@ -544,29 +800,26 @@ def render_semester_page(df_all: pd.DataFrame, semester_label: str, view: str, k
         developed_courses_total = semester_stats["developed"]
         total_courses_target = semester_stats["total"]
         st.markdown(
-            f"""
-            <div style="
-                background:#202020;
-                border:2px solid rgba(255,255,255,0.15);
-                border-left:8px solid #d04546;
-                border-radius:14px;
-                padding:16px 22px;
-                color:white;
-                box-shadow:0 6px 16px rgba(0,0,0,0.30);
-                font-size:18px;
-                font-weight:700;
-                display:inline-block;
-                margin-bottom:14px;
-            ">
-                ✅ <b>Developed Courses This Semester:</b> {developed_courses_total} <span style="color:#cfcfcf;font-weight:500;">out of {total_courses_target}</span>
-            </div>
-            """,
+            f'<div class="htu-developed">✅ <b>Developed Courses This Semester:</b> {developed_courses_total} '
+            f'<span>out of {total_courses_target}</span></div>',
             unsafe_allow_html=True,
         )
 
         st.progress(int(0 if pd.isna(overall) else overall))
         st.write(f"Overall Completion: {0 if pd.isna(overall) else overall:.1f}%")
 
+        st.markdown("<br>", unsafe_allow_html=True)
+        render_progress_history(target_semester, key_prefix)
+        render_semester_forecast(target_semester, key_prefix)
+        render_what_if_weighting(df, target_semester, key_prefix)
+        render_duplicate_courses(
+            load_course_index(target_semester, get_data_version(semester_keys=(target_semester,)), df)["duplicates"],
+            key=f"{key_prefix}_duplicates",
+        )
+
+    elif view == "Bottlenecks":
+        render_bottlenecks_page(df, semester_label, target_semester, key_prefix)
+
     else:
         st.subheader(f"{semester_label} – Schools")
 
@@ -581,7 +834,7 @@ def render_semester_page(df_all: pd.DataFrame, semester_label: str, view: str, k
             key=f"{key_prefix}_college"
         )
 
-        d1 = df[df["School"] == college].copy()
+        d1 = df[df["School"] == college]
         # ==========================
         # HOLD INDICATOR
         # ==========================
@@ -591,24 +844,8 @@ def render_semester_page(df_all: pd.DataFrame, semester_label: str, view: str, k
             and college == "SSBS"
         ):
             st.markdown(
-                """
-                <div style="
-                    background: linear-gradient(90deg, #8B0000, #b22222);
-                    padding: 18px;
-                    border-radius: 14px;
-                    color: white;
-                    margin-bottom: 20px;
-                    border-left: 8px solid #ff4d4d;
-                    box-shadow: 0 4px 10px rgba(0,0,0,0.25);
-                ">
-                    <div style="font-size:24px; font-weight:700;">
-                        ⏸ SSBS is Currently On Hold
-                    </div>
-                    <div style="font-size:15px; color:#f0f0f0; margin-top:6px;">
-                        Spring 2025/2026 development activities for SSBS are temporarily paused.
-                    </div>
-                </div>
-                """,
+                '<div class="htu-hold"><div class="title">⏸ SSBS is Currently On Hold</div>'
+                '<div class="body">Spring 2025/2026 development activities for SSBS are temporarily paused.</div></div>',
                 unsafe_allow_html=True,
             )
 
@@ -632,26 +869,15 @@ def render_semester_page(df_all: pd.DataFrame, semester_label: str, view: str, k
 
             st.markdown("<br>", unsafe_allow_html=True)
             st.markdown(
-                f"""
-                <div style='background:#2b2b2b;border-radius:14px;padding:18px 20px;color:white;box-shadow:0 4px 10px rgba(0,0,0,0.25);'>
-                    <div style='font-size:22px;font-weight:700;margin-bottom:4px;'>{college}</div>
-                    <div style='font-size:14px;color:#cccccc;'>{course_count} Courses</div>
-                </div>
-                """,
+                f'<div class="htu-panel"><div class="htu-panel-title">{college}</div>'
+                f'<div class="htu-panel-sub">{course_count} Courses</div></div>',
                 unsafe_allow_html=True,
             )
 
             st.markdown("<br>", unsafe_allow_html=True)
             st.subheader("School Courses Overview")
 
-            school_table = d1[["Department", "Course \\ pathway", "SMEs", "Progress %"]].copy()
-            school_table["Department"] = school_table["Department"].apply(clean_text_value)
-            school_table["Course \\ pathway"] = school_table["Course \\ pathway"].apply(clean_text_value)
-            school_table["SMEs"] = school_table["SMEs"].apply(clean_text_value)
-            school_table["Progress %"] = school_table["Progress %"].apply(
-                lambda x: f"{float(x):.1f}%" if not pd.isna(x) else ""
-            )
-
+            school_table = d1[["Department", "Course \\ pathway", "SMEs", "Progress %"]]
             school_table = school_table.rename(columns={
                 "Department": "Department",
                 "Course \\ pathway": "Course",
@@ -660,10 +886,14 @@ def render_semester_page(df_all: pd.DataFrame, semester_label: str, view: str, k
             })
 
             school_table = school_table.sort_values(["Department", "Course"]).reset_index(drop=True)
-            st.table(school_table)
+            render_paged_dataframe(
+                school_table,
+                key=f"{key_prefix}_{college}_overview",
+                column_config={"Course Progress": PROGRESS_COLUMN},
+            )
             return
 
-        d2 = d1[d1["Department"] == dept].copy()
+        d2 = d1[d1["Department"] == dept]
 
         courses = d2["Course \\ pathway"].dropna().unique()
         courses = [c for c in courses if clean_text_value(c) != ""]
@@ -684,7 +914,10 @@ def render_semester_page(df_all: pd.DataFrame, semester_label: str, view: str, k
             st.info("Select a course from the sidebar to view course details.")
             return
 
-        row = d2[d2["Course \\ pathway"] == course].iloc[0]
+        course_index = load_course_index(target_semester, get_data_version(semester_keys=(target_semester,)), df)
+        row, copies = lookup_course(course_index, df, college, dept, course, target_semester)
+        if copies > 1:
+            st.warning(f"{course} has {copies} rows in the sheet for {college} / {dept}; showing the first one.")
 
         dean_name = clean_text_value(row.get("Dept. Head", ""))
         smes_name = clean_text_value(row.get("SMEs", ""))
@@ -698,12 +931,25 @@ def render_semester_page(df_all: pd.DataFrame, semester_label: str, view: str, k
         st.write(f"📝 SMEs: {smes_name if smes_name else '—'}")
         st.write(f"🎯 Instructional Designer: {id_name if id_name else '—'}")
 
-        if is_course_deferred_from_previous_semester(df_all, target_semester, course):
+        lineage = load_course_lineage()
+        if is_course_deferred_from_previous_semester(lineage, target_semester, course):
             previous_key = get_previous_semester_key(target_semester)
             previous_label = previous_key.title() if previous_key else "the previous semester"
             current_label = target_semester.title()
             render_deferred_course_notice(previous_label, current_label)
 
+        history = get_course_history(lineage, course)
+        if len(history) > 1:
+            st.subheader("Progress Over Terms")
+            st.table(pd.DataFrame([
+                {
+                    "Semester": h["semester"],
+                    "School": ", ".join(h["schools"]),
+                    "Course Progress": f"{h['progress']:.1f}%",
+                }
+                for h in history
+            ]))
+
         course_note = clean_text_value(row.get("Notes", ""))
         if course_note:
             render_glowy_note("Course Notes", course_note, icon="📌")
@@ -724,10 +970,23 @@ def render_semester_page(df_all: pd.DataFrame, semester_label: str, view: str, k
 # Search Page
 # ==========================
 
+@st.cache_resource(max_entries=2)
+def load_search_index(version: str, _df: pd.DataFrame):
+    with htu_metrics.INDEX_BUILD_SECONDS.time(index="search"):
+        return course_query.build_index(_df)
+
+
 def render_search_page(df_all: pd.DataFrame):
     st.subheader("Search")
 
-    query = st.text_input("Search by Course, SME, ID, Notes, Department, or School")
+    query = st.text_input(
+        "Search by Course, SME, ID, Notes, Department, or School",
+        help=(
+            "Text matches anywhere as one phrase. Field filters: `school:SET`, `sme:\"ahmad ali\"`, `stage:production`, "
+            "`notes:~delay|postpone` (regex), `semester:fall`, `progress<50`, `blocks>=10`, "
+            "`block:7=done`, `outline:todo`. Prefix `-` to negate, `OR` between alternatives."
+        ),
+    )
 
     semester_options = ["All"] + sorted(
         [s for s in df_all["Semester"].dropna().unique() if clean_text_value(s) != ""]
@@ -739,54 +998,20 @@ def render_search_page(df_all: pd.DataFrame):
     semester_filter = st.selectbox("Filter by Semester", semester_options)
     school_filter = st.selectbox("Filter by School", school_options)
 
-    df_search = df_all.copy()
-
-    if semester_filter != "All":
-        df_search = df_search[df_search["Semester"] == semester_filter]
-
-    if school_filter != "All":
-        df_search = df_search[df_search["School"] == school_filter]
-
-    if query.strip():
-        q = query.strip().lower()
-
-        def row_matches(row):
-            searchable_fields = [
-                clean_text_value(row.get("Course \\ pathway", "")),
-                clean_text_value(row.get("SMEs", "")),
-                clean_text_value(row.get("ID", "")),
-                clean_text_value(row.get("Notes", "")),
-                clean_text_value(row.get("Department", "")),
-                clean_text_value(row.get("School", "")),
-                clean_text_value(row.get("Semester", "")),
-                clean_text_value(row.get("Development Stage", "")),
-            ]
-            combined = " | ".join(searchable_fields).lower()
-            return q in combined
-
-        df_search = df_search[df_search.apply(row_matches, axis=1)]
-
-    result_cols = [
-        "Semester",
-        "School",
-        "Department",
-        "Course \\ pathway",
-        "SMEs",
-        "ID",
-        "Development Stage",
-        "Progress %",
-        "Notes",
-    ]
-
-    available_cols = [c for c in result_cols if c in df_search.columns]
-    result_df = df_search[available_cols].copy()
-
-    if "Progress %" in result_df.columns:
-        result_df["Progress %"] = result_df["Progress %"].apply(
-            lambda x: f"{float(x):.1f}%" if not pd.isna(x) else ""
+    try:
+        df_search = course_query.search_courses(
+            df_all,
+            query,
+            semester=None if semester_filter == "All" else semester_filter,
+            school=None if school_filter == "All" else school_filter,
+            index=load_search_index(get_data_version(), df_all),
         )
+    except course_query.QueryError as e:
+        st.error(f"Invalid search: {e}")
+        return
 
-    result_df = result_df.rename(columns={
+    available_cols = [c for c in SEARCH_RESULT_COLUMNS if c in df_search.columns]
+    result_df = df_search[available_cols].rename(columns={
         "Course \\ pathway": "Course",
         "SMEs": "Instructors",
     })
@@ -796,17 +1021,133 @@ def render_search_page(df_all: pd.DataFrame):
     if result_df.empty:
         st.info("No matching results found.")
     else:
-        st.dataframe(result_df.reset_index(drop=True), use_container_width=True)
+        render_paged_dataframe(
+            result_df,
+            key="search_results",
+            column_config={"Progress %": PROGRESS_COLUMN},
+        )
+
+
+# ==========================
+# Instructor Workload
+# ==========================
+# University-wide view over one long (instructor, semester, school,
+# department, course, block) table built per data version, with each
+# instructor's TLC counts matched once into it; each filter combination's
+# per-instructor totals are cached.
+
+WORKLOAD_SORT = {
+    "Courses": "courses",
+    "Blocks": "blocks",
+    "Outlines": "outlines",
+    "Schools": "schools",
+    "Avg Progress": "avg_progress",
+    "TLC Completion": "tlc_percent",
+    "Instructor": "instructor",
+}
+
+
+@st.cache_resource(max_entries=2)
+def load_instructor_assignments(version: str, tlc_version: str, _df: pd.DataFrame, _df_tlc: pd.DataFrame):
+    with htu_metrics.INDEX_BUILD_SECONDS.time(index="instructor_assignments"):
+        return instructor_assignments(_df, _df_tlc)
+
+
+@st.cache_resource(max_entries=16)
+def load_instructor_workload(version: str, tlc_version: str, semesters: tuple, schools: tuple,
+                             _assignments: pd.DataFrame):
+    rows = _assignments
+    if semesters:
+        rows = rows[rows["semester"].isin(semesters)]
+    if schools:
+        rows = rows[rows["school"].isin(schools)]
+    out = instructor_workload(rows)
+    out["tlc_percent"] = np.where(out["tlc_total"] > 0, out["tlc_completed"] / out["tlc_total"].clip(lower=1) * 100, np.nan)
+    return out
+
+
+def render_instructor_workload(df_all: pd.DataFrame):
+    st.subheader("Instructor Workload – All Schools")
+    version = get_data_version()
+    tlc_version, tlc_raws = fetch_tlc_raws()
+    htu_metrics.CACHE_REQUESTS.inc(cache="tlc")
+    df_tlc = process_tlc_sessions(tlc_version, tlc_raws)
+    assignments = load_instructor_assignments(version, tlc_version, df_all, df_tlc)
+
+    semester_options = [s for s in SEMESTER_ORDER if s in set(assignments["semester"])]
+    semesters = st.sidebar.multiselect(
+        "Semesters", semester_options, format_func=str.title, key="inst_wl_semesters"
+    )
+    schools = st.sidebar.multiselect(
+        "Schools", sorted(s for s in assignments["school"].unique() if s), key="inst_wl_schools"
+    )
+    sort_label = st.sidebar.selectbox("Sort by", list(WORKLOAD_SORT), key="inst_wl_sort")
+
+    workload = load_instructor_workload(
+        version, tlc_version, tuple(semesters), tuple(schools), assignments
+    )
+    if workload.empty:
+        st.info("No instructors found for the selected semesters and schools.")
+        return
+
+    sort_col = WORKLOAD_SORT[sort_label]
+    workload = workload.sort_values(sort_col, ascending=sort_col == "instructor", na_position="last")
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Instructors", len(workload))
+    c2.metric("Course Assignments", int(workload["courses"].sum()))
+    c3.metric("Blocks Worked", int(workload["blocks"].sum()))
+
+    st.dataframe(
+        workload.rename(columns={
+            "instructor": "Instructor",
+            "courses": "Courses",
+            "semesters": "Semesters",
+            "schools": "Schools",
+            "departments": "Departments",
+            "avg_progress": "Avg Progress",
+            "outlines": "Outlines",
+            "blocks": "Blocks",
+            "tlc_completed": "TLC Done",
+            "tlc_total": "TLC Sessions",
+            "tlc_percent": "TLC Completion",
+        }),
+        column_config={
+            "Avg Progress": PROGRESS_COLUMN,
+            "TLC Completion": st.column_config.ProgressColumn(format="%.0f%%", min_value=0, max_value=100),
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    instructor = st.selectbox("Instructor details", workload["instructor"].tolist(), key="inst_wl_instructor")
+    rows = assignments[assignments["instructor"] == instructor]
+    if semesters:
+        rows = rows[rows["semester"].isin(semesters)]
+    if schools:
+        rows = rows[rows["school"].isin(schools)]
+
+    detail = (
+        rows.groupby("course_row", sort=False)
+        .agg(
+            Semester=("semester", "first"),
+            School=("school", "first"),
+            Department=("department", "first"),
+            Course=("course", "first"),
+            Progress=("progress", "first"),
+            Tasks=("block", lambda b: ", ".join(t for t in b if t) or "—"),
+        )
+        .sort_values(["Semester", "School", "Course"])
+    )
+    detail["Semester"] = detail["Semester"].str.title()
+    render_paged_dataframe(detail, key="inst_wl_detail", column_config={"Progress": PROGRESS_COLUMN})
 
 
 # ==========================
 # Sidebar
 # ==========================
 
-try:
-    st.sidebar.image("htu_logo.png", use_container_width=True)
-except Exception:
-    st.sidebar.markdown("### HTU")
+htu_ui.render_logo()
 
 st.sidebar.markdown("<br>", unsafe_allow_html=True)
 
@@ -822,29 +1163,53 @@ page = st.sidebar.radio(
     ]
 )
 
+SEMESTER_PAGE_LABELS = {
+    "🌱 Spring 2024/2025": "Spring 2024/2025",
+    "🍂 Fall 2025/2026": "Fall 2025/2026",
+    "🌸 Spring 2025/2026": "Spring 2025/2026",
+}
+
 view = None
-if page in ["🌱 Spring 2024/2025", "🍂 Fall 2025/2026", "🌸 Spring 2025/2026"]:
-    view = st.sidebar.radio("View", ["Overview", "Schools"])
+if page in SEMESTER_PAGE_LABELS:
+    view = st.sidebar.radio("View", ["Overview", "Schools", "Bottlenecks"])
+elif page == "🏫 Instructors":
+    view = st.sidebar.radio("View", ["Workload", "By Department"], key="inst_view")
 
 
 # ==========================
 # Header
 # ==========================
 
-st.markdown("<h1 style='text-align:center;'>HTU</h1>", unsafe_allow_html=True)
+st.markdown("<h1 class='htu-center'>HTU</h1>", unsafe_allow_html=True)
 st.markdown(
-    "<h3 style='text-align:center;'>HTU Digital Twin by 2028 Progress</h3>",
+    "<h3 class='htu-center'>HTU Digital Twin by 2028 Progress</h3>",
     unsafe_allow_html=True,
 )
 st.markdown("<hr>", unsafe_allow_html=True)
+stale_notice = st.empty()
 
 
 # ==========================
-# Load all data once
+# Load the data this page needs
 # ==========================
-
-df_all = load_data()
-df_tlc = load_tlc_sessions()
+# Semester pages push their semester filter down to the gviz query; Home does
+# not read the sheet at all.
+
+start_cache_warmer()
+start_metrics_server()
+track_session()
+page_started = time.perf_counter()
+page_label = page.split(" ", 1)[-1] + (f" / {view}" if view else "")
+# This run renders the data as of the current generation.
+st.session_state["live_generation"] = live_state()["generation"]
+if LIVE_REFRESH_SECONDS > 0:
+    watch_live_generation()
+
+df_all = None
+if page in SEMESTER_PAGE_LABELS:
+    df_all = load_data(semester_keys=(normalize_semester_label(SEMESTER_PAGE_LABELS[page]),))
+elif page != "🏠 Home":
+    df_all = load_data()
 
 
 # ==========================
@@ -866,17 +1231,13 @@ if page == "🏠 Home":
     total_ready = sum(s["ready"] for s in summary)
     total_pct = 0 if total_courses == 0 else round(total_ready / total_courses * 100, 1)
 
-    st.markdown("<h3 style='text-align:center;'>University Snapshot</h3>", unsafe_allow_html=True)
+    st.markdown("<h3 class='htu-center'>University Snapshot</h3>", unsafe_allow_html=True)
 
     total_col = st.columns([1, 2, 1])
     with total_col[1]:
         st.markdown(
-            f"""
-            <div style='background:#2b2b2b;border-radius:16px;padding:20px;text-align:center;color:white;box-shadow:0 4px 10px rgba(0,0,0,0.25);'>
-              <div style='font-size:22px;font-weight:700;margin-bottom:8px;'>Overall Readiness</div>
-              <div style='font-size:16px;color:#cccccc;margin-bottom:8px;'>{total_ready} of {total_courses} courses ready</div>
-            </div>
-            """,
+            '<div class="htu-panel htu-readiness"><div class="htu-panel-title">Overall Readiness</div>'
+            f'<div class="htu-panel-sub">{total_ready} of {total_courses} courses ready</div></div>',
             unsafe_allow_html=True,
         )
         st.progress(int(total_pct))
@@ -892,28 +1253,8 @@ if page == "🏠 Home":
     for i, s in enumerate(display_summary):
         with cols[i]:
             st.markdown(
-                f"""
-                <div style="
-                    background:#2b2b2b;
-                    border-radius:16px;
-                    padding:16px;
-                    color:white;
-                    text-align:center;
-                    box-shadow:0 4px 10px rgba(0,0,0,0.25);
-                    display:flex;
-                    flex-direction:column;
-                    justify-content:center;
-                    align-items:center;
-                    height:180px;
-                ">
-                    <div style="font-size:24px; font-weight:800; margin-bottom:8px; letter-spacing:0.3px;">
-                        {s['school']}
-                    </div>
-                    <div style="font-size:16px; color:#cccccc; margin:0;">
-                        {s['ready']} of {s['total']} ready
-                    </div>
-                </div>
-                """,
+                f'<div class="htu-school-card"><div class="name">{s["school"]}</div>'
+                f'<div class="sub">{s["ready"]} of {s["total"]} ready</div></div>',
                 unsafe_allow_html=True,
             )
             st.progress(int(s["percent"]))
@@ -934,8 +1275,12 @@ elif page == "🔎 Search":
 # INSTRUCTORS TAB
 # ==========================
 
+elif page == "🏫 Instructors" and view == "Workload":
+    render_instructor_workload(df_all)
+
 elif page == "🏫 Instructors":
     st.subheader("Instructors")
+    df_tlc = load_tlc_sessions()
 
     school_options = sorted(df_all["School"].dropna().unique())
     if len(school_options) == 0:
@@ -950,7 +1295,7 @@ elif page == "🏫 Instructors":
             st.info("No departments found for the selected school.")
         else:
             department = st.sidebar.selectbox("Select Department", department_options, key="inst_department")
-            df_d = df_s[df_s["Department"] == department].copy()
+            df_d = df_s[df_s["Department"] == department]
 
             all_instructors = []
             for val in df_d["SMEs"].fillna(""):
@@ -962,11 +1307,7 @@ elif page == "🏫 Instructors":
             else:
                 instructor = st.sidebar.selectbox("Select Instructor", all_instructors, key="inst_instructor")
 
-                def instructor_in_row(smes_val: str) -> bool:
-                    names = split_instructors(smes_val)
-                    return instructor in names
-
-                df_i = df_d[df_d["SMEs"].apply(instructor_in_row)].copy()
+                df_i = instructor_courses(df_d, instructor)
 
                 st.markdown("<hr>", unsafe_allow_html=True)
                 st.write(f"School: {school}")
@@ -979,13 +1320,7 @@ elif page == "🏫 Instructors":
                 else:
                     rows = []
                     for _, r in df_i.iterrows():
-                        do_worked = instructor_mentioned_in_cell(r.get("Detailed Outline", ""), instructor)
-
-                        worked_blocks = []
-                        for i in range(1, 16):
-                            b = f"Block {i}"
-                            if instructor_mentioned_in_cell(r.get(b, ""), instructor):
-                                worked_blocks.append(b)
+                        do_worked, worked_blocks = instructor_worked_cells(r, instructor)
 
                         rows.append({
                             "Semester": clean_text_value(r.get("Semester", "")),
@@ -1002,7 +1337,7 @@ elif page == "🏫 Instructors":
                         .sort_values(["Semester", "Course"])
                         .reset_index(drop=True)
                     )
-                    st.table(report)
+                    render_capped_table(report, key="inst_report")
 
                     st.markdown("<br>", unsafe_allow_html=True)
                     st.subheader("Notes")
@@ -1012,14 +1347,8 @@ elif page == "🏫 Instructors":
                         course_name = clean_text_value(r.get("Course \\ pathway", ""))
                         semester = clean_text_value(r.get("Semester", ""))
 
-                        worked_any = False
-                        if instructor_mentioned_in_cell(r.get("Detailed Outline", ""), instructor):
-                            worked_any = True
-                        else:
-                            for i in range(1, 16):
-                                if instructor_mentioned_in_cell(r.get(f"Block {i}", ""), instructor):
-                                    worked_any = True
-                                    break
+                        do_worked, worked_blocks = instructor_worked_cells(r, instructor)
+                        worked_any = do_worked or bool(worked_blocks)
 
                         note_txt = clean_text_value(r.get("Notes", ""))
                         if worked_any and note_txt:
@@ -1048,37 +1377,18 @@ elif page == "🏫 Instructors":
                     st.markdown("<br>", unsafe_allow_html=True)
                     st.subheader("TLC Sessions Progress")
 
-                    instructor_key = normalize_person_name(instructor)
-                    tlc_match = df_tlc[df_tlc["__name_key__"] == instructor_key].copy()
-
-                    if tlc_match.shape[0] == 0 and df_tlc.shape[0] > 0:
-                        tlc_match = df_tlc[df_tlc["__name_key__"].astype(str).str.contains(re.escape(instructor_key), na=False)].copy()
-                        if tlc_match.shape[0] == 0:
-                            tlc_match = df_tlc[
-                                df_tlc["__name_key__"].apply(
-                                    lambda x: instructor_key in str(x) or str(x) in instructor_key
-                                )
-                            ].copy()
+                    tlc_match = match_tlc_sessions(df_tlc, instructor)
 
                     if tlc_match.shape[0] == 0:
                         st.info("No TLC session data found for this instructor (in the 4 TLC sheets).")
                     else:
-                        session_cols = [
-                            c for c in tlc_match.columns
-                            if c not in {"Instructor Name", "__name_key__"}
-                            and str(c).strip() != ""
-                            and not str(c).strip().lower().startswith("unnamed")
-                        ]
-
-                        merged = {}
-                        for c in session_cols:
-                            merged[c] = bool(tlc_match[c].fillna(False).astype(bool).any())
+                        merged = tlc_session_status(tlc_match)
 
                         session_rows = []
                         completed = 0
-                        total = len(session_cols)
+                        total = len(merged)
 
-                        for c in session_cols:
+                        for c in merged:
                             done = bool(merged.get(c, False))
                             if done:
                                 completed += 1
@@ -1106,12 +1416,19 @@ elif page == "🌸 Spring 2025/2026":
     render_semester_page(df_all, "Spring 2025/2026", view, "spring2526")
 
 
+render_stale_data_notice(stale_notice)
+
+htu_metrics.PAGE_RENDER_SECONDS.observe(time.perf_counter() - page_started, page=page_label)
+if df_all is not None:
+    htu_metrics.PAGE_ROWS.observe(len(df_all), page=page_label)
+
+
 # ==========================
 # Footer
 # ==========================
 
 st.markdown("<br><br><br>", unsafe_allow_html=True)
 st.markdown(
-    "<div style='text-align:center; color:#cccccc;'>Made By: The D. Learn Center at HTU</div>",
+    '<div class="htu-footer-plain">Made By: The D. Learn Center at HTU</div>',
     unsafe_allow_html=True,
 )
@@ -3,28 +3,25 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 
+import htu_core
+import htu_ui
+import sheet_client
+
 st.set_page_config(layout="wide")
+htu_ui.inject_stylesheet()
 
 # ================== DATA LOADING (same style) ==================
 @st.cache_data
 def load_data():
     # Use your CSV export URL
     url = "https://docs.google.com/spreadsheets/d/1kxROgR7P1qatzrabY5NP2wPmWfiib8qh5jXoNA92Cxc/export?format=csv&gid=426592693"
-    df = pd.read_csv(url)
-
-    # Clean headers
-    df.columns = df.columns.str.strip()
-
-    # Normalize Progress %
-    if "Progress %" in df.columns:
-        df["Progress %"] = (
-            df["Progress %"]
-            .astype(str)
-            .str.replace("%", "", regex=False)
-            .str.strip()
-        )
-        df["Progress %"] = pd.to_numeric(df["Progress %"], errors="coerce")
-    else:
+
+    # Arrow parse with stripped headers; stage columns stay as strings for norm_bool
+    schema = {c: "text" for c in ["School", "Department", "Course \\ pathway", "Development Stage", "Dept. Head", "SMEs", "ID"]}
+    schema["Progress %"] = "percent"
+    df = sheet_client.read_sheet_csv(sheet_client.fetch_bytes(url), schema, project=False)
+
+    if "Progress %" not in df.columns:
         df["Progress %"] = np.nan
 
     # Make sure these columns exist to avoid KeyErrors later
@@ -34,10 +31,18 @@ def load_data():
 
     return df
 
+@st.cache_data
+def load_school_summary():
+    return htu_core.school_summary(load_data())
+
+@st.cache_resource
+def load_course_index():
+    return htu_core.build_course_index(load_data(), "fall 2025/2026")
+
 df = load_data()
 
 # ================== SIDEBAR (unchanged visuals) ==================
-st.sidebar.image("htu_logo.png", use_container_width=True)
+htu_ui.render_logo()
 st.sidebar.markdown("<hr style='border:1px solid #d04546'>", unsafe_allow_html=True)
 page = st.sidebar.radio("Go to:", ["Home", "Schools"])
 
@@ -138,23 +143,21 @@ if page == "Home":
 
     # Course Progress by School (unchanged layout/colors)
     st.subheader("🎯 Course Progress by School")
-    schools = df['School'].dropna().unique()
-    if len(schools) == 0:
+    summary = load_school_summary()
+    if summary.empty:
         st.info("No schools found.")
     else:
-        cols = st.columns(len(schools))
-        for i, school in enumerate(schools):
+        cols = st.columns(len(summary))
+        for i, (school, stats) in enumerate(summary.iterrows()):
             with cols[i]:
-                school_df = df[df['School'] == school]
-                avg_progress = school_df['Progress %'].mean()
-                course_count = school_df.shape[0]
+                avg_progress = stats['avg_progress']
+                course_count = int(stats['courses'])
 
-                st.markdown(f"""
-                    <div style='text-align: center; margin-bottom: -20px;'>
-                        <p style='font-size:18px; font-weight:bold; color:white; margin: 0;'>{school}</p>
-                        <p style='font-size:14px; color:#cccccc; margin: 0 0 10px 0;'>{course_count} Courses</p>
-                    </div>
-                """, unsafe_allow_html=True)
+                st.markdown(
+                    f'<div class="htu-donut-head tight"><p class="name">{school}</p>'
+                    f'<p class="sub">{course_count} Courses</p></div>',
+                    unsafe_allow_html=True,
+                )
 
                 # Unique key per chart
                 render_donut_chart(avg_progress, key=f"donut-{i}-{school}")
@@ -182,70 +185,21 @@ if page == "Home":
     """, unsafe_allow_html=True)
 
     # Phase Cards (unchanged style)
-    card_html = """
-    <style>
-    .card-container {
-        display: flex;
-        justify-content: center;
-        gap: 20px;
-        margin-top: 20px;
-        flex-wrap: wrap;
-    }
-    .card {
-        background: #2b2b2b;
-        padding: 20px;
-        border-radius: 12px;
-        width: 250px;
-        color: white;
-        text-align: center;
-        box-shadow: 0px 4px 8px rgba(0, 0, 0, 0.2);
-        transition: transform 0.3s;
-    }
-    .card:hover {
-        transform: scale(1.05);
-    }
-    .card h3 {
-        margin-bottom: 10px;
-        font-size: 18px;
-    }
-    .card p {
-        font-size: 14px;
-        opacity: 0.8;
-    }
-    </style>
-
-    <div class="card-container">
-        <div class="card">
-            <h3>Planning Phase</h3>
-            <p>Establishes the foundation for course development, focusing on the course description, learning objectives, and structure.</p>
-        </div>
-        <div class="card">
-            <h3>Design Phase</h3>
-            <p>Focuses on structuring the course into modules, blocks, and lessons, ensuring alignment with learning objectives and designing engaging content.</p>
-        </div>
-        <div class="card">
-            <h3>Production Phase</h3>
-            <p>Detailed content is developed for each lesson based on the course outline, including materials for video scripts, readings, assignments, and quizzes.</p>
-        </div>
-        <div class="card">
-            <h3>Implementation Phase</h3>
-            <p>The D-Learn Team builds the prepared content into the authoring tool or LMS to create an engaging and seamless learning experience.</p>
-        </div>
-    </div>
-    """
-    st.markdown(card_html, unsafe_allow_html=True)
+    st.markdown(htu_ui.PHASE_CARDS_HTML, unsafe_allow_html=True)
 
 # ================== SCHOOLS PAGE (updated to NEW DATA) ==================
 elif page == "Schools":
     st.sidebar.subheader("Filter Courses")
-    college = st.sidebar.selectbox("Select a College", df['School'].dropna().unique())
+    college = st.sidebar.selectbox("Select a College", df['School'].replace("", np.nan).dropna().unique())
     filtered_df = df[df['School'] == college]
 
-    department = st.sidebar.selectbox("Select a Department", filtered_df['Department'].dropna().unique())
+    department = st.sidebar.selectbox("Select a Department", filtered_df['Department'].replace("", np.nan).dropna().unique())
     filtered_df = filtered_df[filtered_df['Department'] == department]
 
-    course = st.sidebar.selectbox("Select a Course", filtered_df['Course \\ pathway'].dropna().unique())
-    course_row = filtered_df[filtered_df['Course \\ pathway'] == course].iloc[0]
+    course = st.sidebar.selectbox("Select a Course", filtered_df['Course \\ pathway'].replace("", np.nan).dropna().unique())
+    course_row, copies = htu_core.lookup_course(load_course_index(), df, college, department, course)
+    if copies > 1:
+        st.warning(f"{course} has {copies} rows in the sheet for {college} / {department}; showing the first one.")
 
     st.subheader(f"{course} - ({course_row['Development Stage']} Stage)")
     st.markdown("<hr style='border:1px solid gray'>", unsafe_allow_html=True)
@@ -290,22 +244,4 @@ elif page == "Schools":
 # ================== FOOTER (unchanged) ==================
 st.markdown(" ")
 st.markdown(" ")
-st.markdown("""
-<style>
-.footer {
-    position: relative;
-    bottom: 0;
-    width: 100%;
-    text-align: center;
-    padding: 20px 0 10px 0;
-    font-size: 16px;
-    color: #666;
-    border-top: 1px solid #ccc;
-    margin-top: 40px;
-}
-</style>
-
-<div class="footer">
-    Made By: The D. Learn Center at HTU
-</div>
-""", unsafe_allow_html=True)
+st.markdown(htu_ui.FOOTER_HTML, unsafe_allow_html=True)
@@ -1,21 +1,43 @@
 import streamlit as st
 import pandas as pd
 
+import htu_core
+import htu_ui
+import sheet_client
+
 st.set_page_config(layout="wide")
+htu_ui.inject_stylesheet()
+
+TEXT_COLS = ["School", "Department", "Course \\ pathway", "Development Stage", "Dept. Head", "SMEs", "ID"]
+TASK_COLS = ["Course Structure", "Detailed Outline", "M1", "M2", "M3", "M4", "M1.1", "M2.1", "M3.1", "M4.1", "Implementation"]
+
+def task_done(value):
+    # A filled task cell counts as done, except an unticked FALSE checkbox
+    return htu_core.is_filled(value) and str(value).strip().lower() != "false"
 
 @st.cache_data
 def load_data():
     url = "https://docs.google.com/spreadsheets/d/1EL31srR2r_CXmSXEjGprdWCH3HByT5HLGFlsEhImBBM/gviz/tq?tqx=out:csv&sheet=2013"
-    df = pd.read_csv(url)
-    df.columns = df.columns.str.strip()
-    df["Progress %"] = df["Progress %"].astype(str).str.replace("%", "").str.strip()
-    df["Progress %"] = pd.to_numeric(df["Progress %"], errors="coerce")
+    schema = {c: "text" for c in ["Semester"] + TEXT_COLS + TASK_COLS}
+    schema["Progress %"] = "percent"
+    df = sheet_client.read_sheet_csv(sheet_client.fetch_bytes(url), schema)
+    # Rows are indexed under their own semester; without the column the sheet is all Spring 2024/2025
+    semester = df["Semester"] if "Semester" in df.columns else pd.Series("Spring 2024/2025", index=df.index)
+    df["__semester_key__"] = semester.apply(htu_core.normalize_semester_label)
     return df
 
+@st.cache_data
+def load_school_summary():
+    return htu_core.school_summary(load_data())
+
+@st.cache_resource
+def load_course_index():
+    return htu_core.build_course_index(load_data())
+
 df = load_data()
 
 # Sidebar
-st.sidebar.image("htu_logo.png", use_container_width=True)
+htu_ui.render_logo()
 st.sidebar.markdown("<hr style='border:1px solid #d04546'>", unsafe_allow_html=True)
 page = st.sidebar.radio("Go to:", ["Home", "Schools"])
 
@@ -63,22 +85,20 @@ if page == "Home":
 
     # In the Home page section
     st.subheader("🎯 Course Progress by School")
-    schools = df['School'].unique()
-    cols = st.columns(len(schools))
+    summary = load_school_summary()
+    cols = st.columns(len(summary))
 
-    for i, school in enumerate(schools):
+    for i, (school, stats) in enumerate(summary.iterrows()):
         with cols[i]:
-            school_df = df[df['School'] == school]
-            avg_progress = school_df['Progress %'].mean()
-            course_count = school_df.shape[0]
+            avg_progress = stats['avg_progress']
+            course_count = int(stats['courses'])
 
             # ⬆️ Add school name and course count above the chart
-            st.markdown(f"""
-                <div style='text-align: center; margin-bottom: -20px;'>
-                    <p style='font-size:18px; font-weight:bold; color:white; margin: 0;'>{school}</p>
-                    <p style='font-size:14px; color:#cccccc; margin: 0 0 10px 0;'>{course_count} Courses</p>
-                </div>
-            """, unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="htu-donut-head tight"><p class="name">{school}</p>'
+                f'<p class="sub">{course_count} Courses</p></div>',
+                unsafe_allow_html=True,
+            )
 
             # Render donut chart below
             render_donut_chart(avg_progress, "", "")
@@ -109,58 +129,7 @@ if page == "Home":
     """, unsafe_allow_html=True)
 
     # 📘 Phase Cards
-    card_html = """
-    <style>
-    .card-container {
-        display: flex;
-        justify-content: center;
-        gap: 20px;
-        margin-top: 20px;
-        flex-wrap: wrap;
-    }
-    .card {
-        background: #2b2b2b;
-        padding: 20px;
-        border-radius: 12px;
-        width: 250px;
-        color: white;
-        text-align: center;
-        box-shadow: 0px 4px 8px rgba(0, 0, 0, 0.2);
-        transition: transform 0.3s;
-    }
-    .card:hover {
-        transform: scale(1.05);
-    }
-    .card h3 {
-        margin-bottom: 10px;
-        font-size: 18px;
-    }
-    .card p {
-        font-size: 14px;
-        opacity: 0.8;
-    }
-    </style>
-
-    <div class="card-container">
-        <div class="card">
-            <h3>Planning Phase</h3>
-            <p>Establishes the foundation for course development, focusing on the course description, learning objectives, and structure.</p>
-        </div>
-        <div class="card">
-            <h3>Design Phase</h3>
-            <p>Focuses on structuring the course into modules, blocks, and lessons, ensuring alignment with learning objectives and designing engaging content.</p>
-        </div>
-        <div class="card">
-            <h3>Production Phase</h3>
-            <p>Detailed content is developed for each lesson based on the course outline, including materials for video scripts, readings, assignments, and quizzes.</p>
-        </div>
-        <div class="card">
-            <h3>Implementation Phase</h3>
-            <p>The D-Learn Team builds the prepared content into the authoring tool or LMS to create an engaging and seamless learning experience.</p>
-        </div>
-    </div>
-    """
-    st.markdown(card_html, unsafe_allow_html=True)
+    st.markdown(htu_ui.PHASE_CARDS_HTML, unsafe_allow_html=True)
 
 # ------------------ SCHOOLS PAGE ------------------
 elif page == "Schools":
@@ -170,7 +139,10 @@ elif page == "Schools":
     department = st.sidebar.selectbox("Select a Department", filtered_df['Department'].unique())
     filtered_df = filtered_df[filtered_df['Department'] == department]
     course = st.sidebar.selectbox("Select a Course", filtered_df['Course \\ pathway'].unique())
-    course_data = filtered_df[filtered_df['Course \\ pathway'] == course].iloc[0]
+    semester_key = filtered_df.loc[filtered_df['Course \\ pathway'] == course, '__semester_key__'].iloc[0]
+    course_data, copies = htu_core.lookup_course(load_course_index(), df, college, department, course, semester_key)
+    if copies > 1:
+        st.warning(f"{course} has {copies} rows in the sheet for {college} / {department}; showing the first one.")
 
     st.subheader(f"{course} - ({course_data['Development Stage']} Stage)")
     st.markdown("<hr style='border:1px solid gray'>", unsafe_allow_html=True)
@@ -186,13 +158,7 @@ elif page == "Schools":
             "Media Production - M1", "Media Production - M2", "Media Production - M3", "Media Production - M4",
             "Implementation"
         ],
-        "Completion": [
-            "✅" if course_data['Course Structure'] else "❌",
-            "✅" if course_data['Detailed Outline'] else "❌",
-            "✅" if course_data['M1'] else "❌", "✅" if course_data['M2'] else "❌", "✅" if course_data['M3'] else "❌", "✅" if course_data['M4'] else "❌",
-            "✅" if course_data['M1.1'] else "❌", "✅" if course_data['M2.1'] else "❌", "✅" if course_data['M3.1'] else "❌", "✅" if course_data['M4.1'] else "❌",
-            "✅" if course_data['Implementation'] else "❌"
-        ]
+        "Completion": ["✅" if task_done(course_data[c]) else "❌" for c in TASK_COLS]
     }
 
     task_df = pd.DataFrame(task_data)
@@ -205,23 +171,5 @@ elif page == "Schools":
 
 st.markdown(" ")
 st.markdown(" ")
-st.markdown("""
-<style>
-.footer {
-    position: relative;
-    bottom: 0;
-    width: 100%;
-    text-align: center;
-    padding: 20px 0 10px 0;
-    font-size: 16px;
-    color: #666;
-    border-top: 1px solid #ccc;
-    margin-top: 40px;
-}
-</style>
-
-<div class="footer">
-    Made By: The D. Learn Center at HTU
-</div>
-""", unsafe_allow_html=True)
+st.markdown(htu_ui.FOOTER_HTML, unsafe_allow_html=True)
 
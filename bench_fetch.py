@@ -0,0 +1,78 @@
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+
+import requests
+
+import gviz_emulator
+import sheet_client
+
+# ==========================
+# Sheet fetch latency benchmark
+# ==========================
+# Serves a CSV through the local gviz emulator and times repeated downloads:
+# a fresh connection per fetch (what pd.read_csv(url) does) against the
+# pooled, gzip-negotiating sheet_client session.
+#
+#   python bench_fetch.py --csv courses.csv --requests 200 --latency-ms 20
+
+SHEET_ID = "bench"
+
+
+def fetch_fresh(url: str) -> bytes:
+    with urllib.request.urlopen(url, timeout=sheet_client.READ_TIMEOUT) as resp:
+        return resp.read()
+
+
+def time_fetches(fetch, url: str, n: int) -> list:
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fetch(url)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def summarize(label: str, samples: list):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{label:<10} n={len(samples):<5} "
+        f"mean={statistics.mean(samples):7.2f}ms  "
+        f"p50={statistics.median(samples):7.2f}ms  "
+        f"p95={p95:7.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure sheet fetch latency against a local gviz stub.")
+    parser.add_argument("--csv", required=True, help="CSV file to serve as the sheet.")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+
+    server = gviz_emulator.make_server({SHEET_ID: args.csv}, port=args.port, latency=args.latency_ms / 1000.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/spreadsheets/d/{SHEET_ID}/gviz/tq?tqx=out:csv"
+
+    session = sheet_client.make_session()
+    plain = requests.Session()
+    plain.headers["Accept-Encoding"] = "identity"
+
+    size_raw = len(plain.get(url).content)
+    with session.get(url, stream=True) as resp:
+        size_wire = len(resp.raw.read(decode_content=False))
+    print(f"payload: {size_raw} bytes raw, {size_wire} bytes on the wire with gzip")
+
+    try:
+        summarize("fresh", time_fetches(fetch_fresh, url, args.requests))
+        summarize("pooled", time_fetches(lambda u: sheet_client.fetch_bytes(u, session), url, args.requests))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
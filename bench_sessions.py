@@ -0,0 +1,347 @@
+import argparse
+import asyncio
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+try:
+    import websockets
+except ImportError:  # not a dependency of the app, only of this harness
+    raise SystemExit("bench_sessions.py needs the websockets package: pip install websockets") from None
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+import gviz_emulator
+import htu_core
+
+# ==========================
+# Concurrent session load test
+# ==========================
+# Starts one `streamlit run HTU_Blended_Courses_Plan.py` process against the
+# local gviz emulator and connects N simulated viewers to it over the same
+# websocket protocol the browser uses: each session sends rerun requests with
+# its widget values and waits for the script to finish. Sessions follow
+# navigation scenarios
+#
+#   overview     Home -> semester Overview -> Schools -> school -> department -> course
+#   search       Search -> a few queries
+#   instructors  Instructors workload -> filtered by school -> By Department
+#
+# all starting at the same moment, and every rerun is timed from request to
+# script_finished. The report gives p50/p95/p99 rerun latency per step and
+# overall, reruns per second, and the server's resident memory per session.
+# The harness needs the websockets package (pip install websockets), which
+# the dashboard itself does not use.
+#
+#   python bench_sessions.py --courses courses.csv --tlc tlc1.csv --tlc tlc2.csv \
+#       --sessions 20 --iterations 3 --mix overview=2,search=1,instructors=1
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "HTU_Blended_Courses_Plan.py")
+WIDGET_TYPES = {"radio", "selectbox", "multiselect", "text_input"}
+SEMESTER_PAGES = ["🌱 Spring 2024/2025", "🍂 Fall 2025/2026", "🌸 Spring 2025/2026"]
+SEARCH_LABEL = "Search by Course, SME, ID, Notes, Department, or School"
+SEARCH_QUERIES = ["ahmad", "progress<50", "school:SET block:1=todo", "stage:=production OR notes:~delay"]
+
+
+def sheet_id(url: str) -> str:
+    return re.search(r"/spreadsheets/d/([^/]+)/", url).group(1)
+
+
+def rss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+# ==========================
+# Simulated browser session
+# ==========================
+
+class Session:
+    def __init__(self, url: str):
+        self.url = url
+        self.ws = None
+        self.widgets = {}  # label -> (widget type, widget id, options)
+        self.values = {}   # widget id -> WidgetState sent with every rerun
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        await self.ws.close()
+
+    async def rerun(self) -> tuple:
+        # (seconds until script_finished, exception message or None)
+        msg = BackMsg()
+        msg.rerun_script.widget_states.widgets.extend(self.values.values())
+        started = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+
+        widgets, error = {}, None
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in WIDGET_TYPES:
+                    w = getattr(element, element_type)
+                    options = [] if element_type == "text_input" else list(w.options)
+                    widgets[w.label] = (element_type, w.id, options)
+                elif element_type == "exception":
+                    error = element.exception.message
+            elif kind == "script_finished" and fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        elapsed = time.perf_counter() - started
+
+        # Like the browser, only widgets on the current page keep a value.
+        self.widgets = widgets
+        live = {wid for _, wid, _ in widgets.values()}
+        self.values = {wid: state for wid, state in self.values.items() if wid in live}
+        return elapsed, error
+
+    def options(self, label: str) -> list:
+        return self.widgets[label][2] if label in self.widgets else []
+
+    def set(self, label: str, value):
+        widget_type, wid, _ = self.widgets[label]
+        state = WidgetState(id=wid)
+        if widget_type == "multiselect":
+            state.string_array_value.data.extend(value)
+        else:
+            state.string_value = value
+        self.values[wid] = state
+
+
+# ==========================
+# Navigation scenarios
+# ==========================
+# A scenario is a list of (step label, action); an action sets widgets on the
+# session from what the previous run rendered, then the step's rerun is timed.
+
+def pick(session: Session, label: str, rng: random.Random, skip_first: bool = False):
+    options = session.options(label)[1 if skip_first else 0:]
+    if options:
+        session.set(label, rng.choice(options))
+
+
+def overview_steps(rng: random.Random) -> list:
+    semester = rng.choice(SEMESTER_PAGES)
+    return [
+        ("home", lambda s: s.set("Go to", "🏠 Home")),
+        ("overview", lambda s: s.set("Go to", semester)),
+        ("schools", lambda s: s.set("View", "Schools")),
+        ("school", lambda s: pick(s, "Select a College", rng)),
+        ("department", lambda s: pick(s, "Select Department", rng, skip_first=True)),
+        ("course", lambda s: pick(s, "Select Course", rng, skip_first=True)),
+    ]
+
+
+def search_steps(rng: random.Random) -> list:
+    steps = [("home", lambda s: s.set("Go to", "🏠 Home")), ("search", lambda s: s.set("Go to", "🔎 Search"))]
+    for query in rng.sample(SEARCH_QUERIES, 3):
+        steps.append(("query", lambda s, q=query: s.set(SEARCH_LABEL, q)))
+    return steps
+
+
+def instructors_steps(rng: random.Random) -> list:
+    return [
+        ("home", lambda s: s.set("Go to", "🏠 Home")),
+        ("workload", lambda s: s.set("Go to", "🏫 Instructors")),
+        ("workload filter", lambda s: s.set("Schools", rng.sample(s.options("Schools"), min(1, len(s.options("Schools")))))),
+        ("by department", lambda s: s.set("View", "By Department")),
+    ]
+
+
+SCENARIOS = {
+    "overview": overview_steps,
+    "search": search_steps,
+    "instructors": instructors_steps,
+}
+
+
+def parse_mix(text: str) -> list:
+    weighted = []
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'; choose from {', '.join(SCENARIOS)}")
+        weighted += [name.strip()] * int(weight or 1)
+    return weighted
+
+
+async def run_session(n: int, url: str, args, mix: list, start: asyncio.Event, results: list, errors: list,
+                      sessions: list):
+    rng = random.Random(args.seed + n)
+    offset = rng.randrange(len(mix))
+    session = Session(url)
+    await session.connect()
+    sessions.append(session)  # kept open until memory is measured
+    await session.rerun()
+    await start.wait()
+
+    for i in range(args.iterations):
+        scenario = mix[(offset + i) % len(mix)]
+        for step, action in SCENARIOS[scenario](rng):
+            if args.think_ms:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_ms / 1000.0)
+            try:
+                action(session)
+                elapsed, error = await session.rerun()
+            except Exception as e:
+                errors.append((scenario, step, f"{type(e).__name__}: {e}"))
+                break
+            if error:
+                errors.append((scenario, step, error))
+                break
+            results.append((scenario, step, elapsed))
+
+
+async def run_sessions(url: str, args, mix: list, sessions: list) -> tuple:
+    results, errors = [], []
+    start = asyncio.Event()
+    tasks = [
+        asyncio.create_task(run_session(n, url, args, mix, start, results, errors, sessions))
+        for n in range(args.sessions)
+    ]
+    # Let every session connect and render Home before the timed start.
+    while len(sessions) < args.sessions and not any(t.done() for t in tasks):
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.5)
+    started = time.perf_counter()
+    start.set()
+    await asyncio.gather(*tasks)
+    return results, errors, time.perf_counter() - started
+
+
+# ==========================
+# Report
+# ==========================
+
+def summarize(label: str, seconds: list):
+    ordered = sorted(s * 1000.0 for s in seconds)
+    print(
+        f"{label:<28} n={len(ordered):<6} "
+        f"p50={percentile(ordered, 0.50):8.1f}ms  "
+        f"p95={percentile(ordered, 0.95):8.1f}ms  "
+        f"p99={percentile(ordered, 0.99):8.1f}ms  "
+        f"max={ordered[-1]:8.1f}ms"
+    )
+
+
+def report(results: list, errors: list, wall: float, sessions: int, rss_before: int, rss_after: int):
+    by_step = {}
+    for scenario, step, seconds in results:
+        by_step.setdefault(f"{scenario}/{step}", []).append(seconds)
+    for label in sorted(by_step):
+        summarize(label, by_step[label])
+    if results:
+        summarize("all reruns", [s for _, _, s in results])
+
+    print(f"\nsessions: {sessions}   wall: {wall:.1f}s   "
+          f"throughput: {len(results) / wall if wall else 0.0:.1f} reruns/s")
+    print(f"server memory: {rss_after / 2**20:.0f} MiB resident, "
+          f"{(rss_after - rss_before) / max(sessions, 1) / 2**20:.2f} MiB per session above the warmed process")
+    if errors:
+        print(f"errors: {len(errors)}")
+        for scenario, step, error in errors[:10]:
+            print(f"  {scenario}/{step}: {error}")
+
+
+# ==========================
+# Server
+# ==========================
+
+def start_app(port: int, sheets_host: str, workdir: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        HTU_SHEETS_HOST=sheets_host,
+        HTU_SHARED_CACHE_DIR=os.path.join(workdir, "shared"),
+        HTU_HISTORY_PATH=os.path.join(workdir, "history.sqlite"),
+        HTU_METRICS_PORT=os.environ.get("HTU_METRICS_PORT", "0"),
+    )
+    app = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_SCRIPT,
+         "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false"],
+        cwd=os.path.dirname(APP_SCRIPT),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as resp:
+                if resp.status == 200:
+                    return app
+        except OSError:
+            time.sleep(0.2)
+    app.terminate()
+    raise SystemExit("Streamlit did not come up within 60 seconds")
+
+
+async def bench(url: str, app: subprocess.Popen, args, mix: list):
+    if not args.cold:
+        # One session walks every scenario once so the timed run starts warm.
+        warm_sessions = []
+        warm = argparse.Namespace(**{**vars(args), "sessions": 1, "iterations": len(SCENARIOS), "think_ms": 0})
+        await run_sessions(url, warm, list(SCENARIOS), warm_sessions)
+        for session in warm_sessions:
+            await session.close()
+        await asyncio.sleep(1.0)
+
+    rss_before = rss_bytes(app.pid)
+    sessions = []
+    results, errors, wall = await run_sessions(url, args, mix, sessions)
+    rss_after = rss_bytes(app.pid)
+    for session in sessions:
+        await session.close()
+    report(results, errors, wall, args.sessions, rss_before, rss_after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent simulated sessions.")
+    parser.add_argument("--courses", required=True, help="CSV file to serve as the courses sheet.")
+    parser.add_argument("--tlc", action="append", default=[], help="CSV for a TLC sheet (repeatable, up to 4).")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=3, help="Scenarios each session runs.")
+    parser.add_argument("--mix", default="overview=2,search=1,instructors=1",
+                        help="Scenario weights, e.g. overview=2,search=1.")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean pause before each step.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added by the sheet stub.")
+    parser.add_argument("--port", type=int, default=8599, help="Port for the Streamlit server under test.")
+    parser.add_argument("--cold", action="store_true", help="Skip the warm-up session.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    sheets = {sheet_id(htu_core.DATA_URL): args.courses}
+    for url, path in zip(htu_core.TLC_SHEETS, args.tlc):
+        sheets[sheet_id(url)] = path
+    stub = gviz_emulator.make_server(sheets, port=0, latency=args.latency_ms / 1000.0)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+    workdir = tempfile.mkdtemp(prefix="htu-bench-")
+    app = start_app(args.port, f"http://127.0.0.1:{stub.server_address[1]}", workdir)
+    try:
+        asyncio.run(bench(f"ws://127.0.0.1:{args.port}/_stcore/stream", app, args, mix))
+    finally:
+        app.terminate()
+        app.wait()
+        stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from htu_core import completion_matrix, normalize_semester_label
+
+# ==========================
+# Course search query language
+# ==========================
+# Space-separated terms are ANDed; the word OR between terms starts an
+# alternative group; a leading "-" negates a term. Double quotes group words;
+# apostrophes are ordinary characters. Adjacent plain words form one phrase,
+# matched like the original substring search, and a "word:" that is not a
+# field below is plain text too.
+#
+#   intro to ai               free text over course, SMEs, ID, notes, ...
+#   school:SET                exact (case-insensitive) school
+#   sme:"ahmad ali"           substring of a text field
+#   stage:=production         exact text
+#   notes:~delay|postpone     case-insensitive regex
+#   semester:fall             substring of the normalized semester key
+#   progress<50  blocks>=10   numeric comparisons (< <= > >= = !=)
+#   block:7=done  block:7=todo  outline:done
+#
+# Queries are parsed once (lru_cache) into a tuple of term groups, and every
+# term is evaluated as one vectorized mask over a per-data-version index of
+# lowercased text columns, the progress array and the completion matrix.
+
+TEXT_FIELDS = {
+    "school": "School",
+    "department": "Department",
+    "dept": "Department",
+    "course": "Course \\ pathway",
+    "sme": "SMEs",
+    "smes": "SMEs",
+    "id": "ID",
+    "stage": "Development Stage",
+    "notes": "Notes",
+    "head": "Dept. Head",
+    "semester": "__semester_key__",
+}
+# ':' means equality rather than substring for these.
+KEYWORD_FIELDS = {"school"}
+NUMERIC_FIELDS = {"progress", "blocks"}
+TASK_FIELDS = {"block", "outline"}
+
+TERM_RE = re.compile(r"^([A-Za-z]+)(<=|>=|!=|:|<|>|=)(.*)$")
+BLOCK_RE = re.compile(r"^(\d{1,2})(?:=(\w+))?$")
+DONE_WORDS = {"done", "yes", "true", "1", "complete", "completed"}
+TODO_WORDS = {"todo", "no", "false", "0", "open", "missing"}
+
+
+class QueryError(ValueError):
+    pass
+
+
+# ==========================
+# Parsing
+# ==========================
+
+def parse_task_state(word: str) -> bool:
+    word = (word or "done").lower()
+    if word in DONE_WORDS:
+        return True
+    if word in TODO_WORDS:
+        return False
+    raise QueryError(f"Expected done or todo, got '{word}'")
+
+
+def parse_term(token: str) -> tuple:
+    # (kind, field, op, value, negated)
+    negated = token.startswith("-") and len(token) > 1
+    if negated:
+        token = token[1:]
+
+    m = TERM_RE.match(token)
+    field = m.group(1).lower() if m else None
+
+    if m is None or field not in TEXT_FIELDS.keys() | NUMERIC_FIELDS | TASK_FIELDS:
+        return ("text", None, "contains", token.lower(), negated)
+
+    op, value = m.group(2), m.group(3).strip()
+    if value == "" and field != "outline":
+        raise QueryError(f"Missing value for '{field}'")
+
+    if field in NUMERIC_FIELDS:
+        op = "=" if op == ":" else op
+        try:
+            return ("number", field, op, float(value.rstrip("%")), negated)
+        except ValueError:
+            raise QueryError(f"'{field}' needs a number, got '{value}'") from None
+
+    if field == "block":
+        bm = BLOCK_RE.match(value)
+        if op != ":" or bm is None or not 1 <= int(bm.group(1)) <= 15:
+            raise QueryError("Use block:N=done or block:N=todo with N from 1 to 15")
+        return ("task", field, "=", (int(bm.group(1)), parse_task_state(bm.group(2))), negated)
+
+    if field == "outline":
+        return ("task", field, "=", (0, parse_task_state(value)), negated)
+
+    if op not in (":", "=", "!="):
+        raise QueryError(f"'{field}' only supports ':', '=' and '!='")
+    if op == "!=":
+        op, negated = "=", not negated
+
+    mode = "equals" if op == "=" or field in KEYWORD_FIELDS else "contains"
+    if value.startswith("~"):
+        mode, value = "regex", value[1:]
+    elif value.startswith("="):
+        mode, value = "equals", value[1:]
+
+    if mode == "regex":
+        try:
+            re.compile(value)
+        except re.error as e:
+            raise QueryError(f"Bad pattern for '{field}': {e}") from None
+        return ("text", field, "regex", value, negated)
+
+    if field == "semester":
+        value = normalize_semester_label(value)
+    return ("text", field, mode, value.lower(), negated)
+
+
+def tokenize(text: str) -> list:
+    # (token, quoted) pairs split on whitespace outside double quotes; the
+    # quote characters are dropped and an unclosed quote runs to the end.
+    tokens, chars, quoted, in_quotes = [], [], False, False
+    for ch in text:
+        if ch == '"':
+            in_quotes, quoted = not in_quotes, True
+        elif ch.isspace() and not in_quotes:
+            if chars or quoted:
+                tokens.append(("".join(chars), quoted))
+            chars, quoted = [], False
+        else:
+            chars.append(ch)
+    if chars or quoted:
+        tokens.append(("".join(chars), quoted))
+    return tokens
+
+
+@lru_cache(maxsize=256)
+def parse_query(text: str) -> tuple:
+    # tuple of OR-groups, each a tuple of ANDed terms
+    groups, current, phrase = [], [], []
+
+    def end_phrase():
+        if phrase:
+            current.append(("text", None, "contains", " ".join(phrase).lower(), False))
+            phrase.clear()
+
+    for token, quoted in tokenize(text or ""):
+        if token == "OR" and not quoted:
+            end_phrase()
+            if current:
+                groups.append(tuple(current))
+            current = []
+            continue
+        term = parse_term(token)
+        if term[0] == "text" and term[1] is None and not term[4] and not quoted:
+            phrase.append(token)
+        else:
+            end_phrase()
+            current.append(term)
+    end_phrase()
+    if current:
+        groups.append(tuple(current))
+    return tuple(groups)
+
+
+# ==========================
+# Evaluation
+# ==========================
+
+def build_index(df: pd.DataFrame) -> dict:
+    text = {col: df[col].fillna("").astype(str).str.lower() for col in set(TEXT_FIELDS.values())}
+    text["__search_text__"] = df["__search_text__"]
+    tasks = completion_matrix(df)
+    return {
+        "text": text,
+        "progress": df["Progress %"].to_numpy(dtype=float),
+        "tasks": tasks,
+        "blocks": tasks[:, 1:].sum(axis=1),
+        "size": len(df),
+    }
+
+
+NUMERIC_OPS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "=": np.equal,
+    "!=": np.not_equal,
+}
+
+
+def term_mask(index: dict, term: tuple) -> np.ndarray:
+    kind, field, op, value, negated = term
+
+    if kind == "number":
+        values = index["progress"] if field == "progress" else index["blocks"]
+        mask = NUMERIC_OPS[op](values, value)
+    elif kind == "task":
+        position, done = value
+        mask = index["tasks"][:, position] == done
+    else:
+        col = index["text"]["__search_text__" if field is None else TEXT_FIELDS[field]]
+        if op == "regex":
+            mask = col.str.contains(value, regex=True, flags=re.IGNORECASE).to_numpy(dtype=bool)
+        elif op == "equals":
+            mask = (col == value).to_numpy(dtype=bool)
+        else:
+            mask = col.str.contains(value, regex=False).to_numpy(dtype=bool)
+
+    return ~mask if negated else mask
+
+
+def query_mask(index: dict, text: str) -> np.ndarray:
+    groups = parse_query(text.strip())
+    if not groups:
+        return np.ones(index["size"], dtype=bool)
+
+    mask = np.zeros(index["size"], dtype=bool)
+    for group in groups:
+        group_mask = np.ones(index["size"], dtype=bool)
+        for term in group:
+            group_mask &= term_mask(index, term)
+        mask |= group_mask
+    return mask
+
+
+def search_courses(df: pd.DataFrame, query: str = "", semester: str = None, school: str = None,
+                   index: dict = None) -> pd.DataFrame:
+    mask = np.ones(len(df), dtype=bool)
+    if semester:
+        mask &= (df["Semester"] == semester).to_numpy()
+    if school:
+        mask &= (df["School"] == school).to_numpy()
+    if (query or "").strip():
+        mask &= query_mask(index if index is not None else build_index(df), query)
+    return df[mask]
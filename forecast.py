@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+import snapshot_store
+
+# ==========================
+# Completion forecast
+# ==========================
+# Projects when each course and school reaches 100% from the progress
+# history in snapshot_store. History is sampled daily "as of" (every course
+# keeps its latest value until it changes, up to today), and a least-squares
+# completion rate is fitted for all courses at once over the last
+# FORECAST_WINDOW_DAYS days as one NumPy pass over the day x course matrix.
+#
+# A course is at risk when it is unfinished and either has stopped moving or
+# is projected to finish after the semester deadline. The MIN_SAMPLES gate
+# counts the days on which a data version was recorded since the course's
+# first snapshot (days before the window count once, as the day carried into
+# it), so a course that sat unchanged through several versions is Stalled
+# rather than short of history.
+
+FORECAST_WINDOW_DAYS = 28
+MIN_SAMPLES = 3
+
+STATUS_DONE = "Done"
+STATUS_ON_TRACK = "On track"
+STATUS_LATE = "Late"
+STATUS_STALLED = "Stalled"
+STATUS_UNKNOWN = "Not enough history"
+
+
+def fit_rates(y: np.ndarray, samples: np.ndarray = None) -> tuple:
+    # Per-column least-squares slope of y (days x courses, NaN = no sample)
+    # against the day number; NaN where fewer than MIN_SAMPLES samples
+    # (observed samples per column, default: the non-NaN cells).
+    t = np.arange(y.shape[0], dtype=float)[:, None]
+    mask = ~np.isnan(y)
+    safe_n = np.maximum(mask.sum(axis=0), 1)
+    n = mask.sum(axis=0) if samples is None else np.asarray(samples)
+
+    t_mean = np.where(mask, t, 0.0).sum(axis=0) / safe_n
+    y_mean = np.where(mask, y, 0.0).sum(axis=0) / safe_n
+    dt = np.where(mask, t - t_mean, 0.0)
+    dy = np.where(mask, y - y_mean, 0.0)
+    var = (dt * dt).sum(axis=0)
+    cov = (dt * dy).sum(axis=0)
+
+    slope = np.full(y.shape[1], np.nan)
+    ok = (n >= MIN_SAMPLES) & (var > 0)
+    np.divide(cov, var, out=slope, where=ok)
+    return slope, n
+
+
+def project_finish(current: np.ndarray, slope: np.ndarray, today: pd.Timestamp) -> pd.DatetimeIndex:
+    days = np.full(current.shape, np.nan)
+    moving = slope > 0
+    np.divide(100.0 - current, slope, out=days, where=moving)
+    days = np.where(current >= 100.0, 0.0, days)
+    return today + pd.to_timedelta(np.ceil(days), unit="D")
+
+
+def classify(current: np.ndarray, slope: np.ndarray, finish: pd.DatetimeIndex, deadline) -> np.ndarray:
+    late = np.zeros(current.shape, dtype=bool) if deadline is None else np.asarray(finish > deadline)
+    return np.select(
+        [current >= 100.0, np.isnan(slope), slope <= 0, late],
+        [STATUS_DONE, STATUS_UNKNOWN, STATUS_STALLED, STATUS_LATE],
+        default=STATUS_ON_TRACK,
+    )
+
+
+def observed_days(history: pd.DataFrame, days: pd.DatetimeIndex, start: pd.Timestamp, by: list) -> pd.Series:
+    # Per group, the version days from its first snapshot on; days before
+    # `start` all count as `start`.
+    days = days.where(days >= start, start).unique()
+    first = history.groupby(by)["taken_at"].min().dt.floor("D").clip(lower=start)
+    return pd.Series(len(days) - days.searchsorted(first.to_numpy()), index=first.index)
+
+
+def daily_progress(semester_key: str, today: pd.Timestamp, path: str = None):
+    history = snapshot_store.query_snapshots(end=today + pd.Timedelta(days=1), semester_key=semester_key, path=path)
+    if history.empty:
+        return None, history
+
+    # Courses whose end marker is in force today are left out.
+    wide = snapshot_store.as_of_frame(history, "progress", "D", end=today).tail(FORECAST_WINDOW_DAYS)
+    wide = wide.loc[:, wide.iloc[-1].notna()]
+    return wide, history
+
+
+def forecast_semester(semester_key: str, deadline=None, today=None, path: str = None) -> dict:
+    # {"courses": one row per course, "schools": one row per school}
+    today = snapshot_store.to_utc(today or pd.Timestamp.now(tz="UTC")).floor("D")
+    deadline = None if deadline is None else snapshot_store.to_utc(deadline)
+
+    wide, history = daily_progress(semester_key, today, path)
+    if wide is None:
+        return {"courses": pd.DataFrame(), "schools": pd.DataFrame()}
+    days = snapshot_store.version_days(end=today + pd.Timedelta(days=1), path=path)
+
+    y = wide.to_numpy(dtype=float)
+    samples = observed_days(history, days, wide.index[0], ["school", "course_key"]).reindex(wide.columns, fill_value=0).to_numpy()
+    slope, _ = fit_rates(y, samples)
+    current = y[-1]
+    finish = project_finish(current, slope, today)
+
+    names = history.groupby("course_key")["course"].last()
+    schools = wide.columns.get_level_values("school")
+    course_keys = wide.columns.get_level_values("course_key")
+    courses = pd.DataFrame({
+        "school": schools,
+        "course": names.reindex(course_keys).to_numpy(),
+        "progress": current,
+        "rate_per_week": slope * 7.0,
+        "samples": samples,
+        "expected_finish": finish,
+        "status": classify(current, slope, finish, deadline),
+    })
+    courses["at_risk"] = courses["status"].isin([STATUS_LATE, STATUS_STALLED])
+
+    # Schools are fitted on their mean-progress series, like one big course.
+    school_wide = wide.T.groupby(level="school").mean().T
+    school_samples = observed_days(history, days, wide.index[0], ["school"]).reindex(school_wide.columns, fill_value=0)
+    school_slope, _ = fit_rates(school_wide.to_numpy(dtype=float), school_samples.to_numpy())
+    school_current = school_wide.to_numpy(dtype=float)[-1]
+    school_finish = project_finish(school_current, school_slope, today)
+    school_df = pd.DataFrame({
+        "school": school_wide.columns,
+        "courses": courses.groupby("school").size().reindex(school_wide.columns).to_numpy(),
+        "progress": school_current,
+        "rate_per_week": school_slope * 7.0,
+        "expected_finish": school_finish,
+        "status": classify(school_current, school_slope, school_finish, deadline),
+        "at_risk": courses.groupby("school")["at_risk"].sum().reindex(school_wide.columns).to_numpy(),
+    })
+
+    return {"courses": courses, "schools": school_df}
@@ -0,0 +1,144 @@
+import argparse
+import gzip
+import io
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+# ==========================
+# Local gviz endpoint emulator
+# ==========================
+# Serves local CSV files the way Google Sheets serves
+#   /spreadsheets/d/<sheet id>/gviz/tq?tqx=out:csv&tq=<query>
+# and understands the subset of the query language the dashboard's fetch
+# planner emits:
+#   select * | select A, B, ...
+#   where lower(X) matches '<regex>' [or ...]  |  where X = '<value>' [or ...]
+#   limit N
+#
+# Run the dashboard against it with:
+#   python gviz_emulator.py --sheet 1EL31...=courses.csv --port 8765
+#   HTU_SHEETS_HOST=http://127.0.0.1:8765 streamlit run HTU_Blended_Courses_Plan.py
+
+QUERY_RE = re.compile(
+    r"^\s*select\s+(?P<select>\*|[A-Z]+(?:\s*,\s*[A-Z]+)*)"
+    r"(?:\s+where\s+(?P<where>.+?))?"
+    r"(?:\s+limit\s+(?P<limit>\d+))?\s*$",
+    re.IGNORECASE,
+)
+MATCHES_RE = re.compile(r"^lower\(([A-Z]+)\)\s+matches\s+'(.*)'$", re.IGNORECASE)
+EQUALS_RE = re.compile(r"^([A-Z]+)\s*=\s*'(.*)'$")
+
+
+def letter_index(letters: str) -> int:
+    i = 0
+    for ch in letters.upper():
+        i = i * 26 + (ord(ch) - ord("A") + 1)
+    return i - 1
+
+
+def where_mask(df: pd.DataFrame, where: str) -> pd.Series:
+    mask = pd.Series(False, index=df.index)
+    for cond in re.split(r"\s+or\s+", where.strip(), flags=re.IGNORECASE):
+        m = MATCHES_RE.match(cond.strip())
+        if m:
+            col = df.iloc[:, letter_index(m.group(1))].fillna("").astype(str).str.lower()
+            mask |= col.str.fullmatch(m.group(2))
+            continue
+        m = EQUALS_RE.match(cond.strip())
+        if m:
+            col = df.iloc[:, letter_index(m.group(1))].fillna("").astype(str)
+            mask |= col == m.group(2)
+            continue
+        raise ValueError(f"Unsupported where clause: {cond}")
+    return mask
+
+
+def run_query(df: pd.DataFrame, tq: str) -> pd.DataFrame:
+    if not tq:
+        return df
+
+    m = QUERY_RE.match(tq)
+    if m is None:
+        raise ValueError(f"Unsupported query: {tq}")
+
+    if m.group("where"):
+        df = df[where_mask(df, m.group("where"))]
+
+    if m.group("select") != "*":
+        cols = [letter_index(c.strip()) for c in m.group("select").split(",")]
+        df = df.iloc[:, cols]
+
+    if m.group("limit") is not None:
+        df = df.head(int(m.group("limit")))
+
+    return df
+
+
+def make_handler(sheets: dict, latency: float = 0.0):
+    class GvizHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            m = re.match(r"^/spreadsheets/d/([^/]+)/gviz/tq$", parsed.path)
+            if m is None or m.group(1) not in sheets:
+                self.send_error(404)
+                return
+
+            if latency:
+                time.sleep(latency)
+
+            tq = parse_qs(parsed.query).get("tq", [""])[0]
+            df = pd.read_csv(sheets[m.group(1)], dtype=str, keep_default_na=False)
+            try:
+                out = run_query(df, tq)
+            except ValueError as e:
+                self.send_error(400, str(e))
+                return
+
+            buf = io.StringIO()
+            out.to_csv(buf, index=False)
+            body = buf.getvalue().encode("utf-8")
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv; charset=utf-8")
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return GvizHandler
+
+
+def make_server(sheets: dict, host: str = "127.0.0.1", port: int = 8765, latency: float = 0.0) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((host, port), make_handler(sheets, latency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve local CSV files through a gviz-compatible endpoint.")
+    parser.add_argument("--sheet", action="append", default=[], metavar="ID=PATH",
+                        help="Spreadsheet id and the CSV file that backs it (repeatable).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Artificial delay added to every response.")
+    args = parser.parse_args()
+
+    sheets = dict(item.split("=", 1) for item in args.sheet)
+    server = make_server(sheets, args.host, args.port, args.latency_ms / 1000.0)
+    print(f"Serving {len(sheets)} sheet(s) on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pandas as pd
+
+import course_query
+import htu_core
+import htu_metrics
+
+# ==========================
+# Local read-only JSON API
+# ==========================
+# Serves the numbers the dashboard shows to other tools:
+#
+#   GET /api/meta                          data version and loaded-at time
+#   GET /api/rollups/<name>?semester=&school=
+#                                          semesters | schools | departments | instructors
+#   GET /api/courses/<course name>         course rows plus semester history
+#   GET /api/instructors/<name>            courses, worked blocks, TLC sessions
+#   GET /api/search?q=&semester=&school=&limit=
+#                                          q uses the course_query language
+#   GET /metrics                           htu_metrics in Prometheus text format
+#
+# Sheets are loaded through htu_core (and so through the shared cache); the
+# data version is re-checked at most every CHECK_INTERVAL seconds. Every
+# response carries an ETag derived from the data version and the request
+# path, the RESPONSE_CACHE_SIZE most recently used responses are kept until
+# the version changes, and a matching If-None-Match is answered with 304.
+#
+#   python htu_api.py --port 8700
+
+CHECK_INTERVAL = 30
+SEARCH_LIMIT = 100
+RESPONSE_CACHE_SIZE = 256
+
+
+def json_records(df: pd.DataFrame) -> list:
+    cols = [c for c in df.columns if not str(c).startswith("__")]
+    return json.loads(df[cols].to_json(orient="records", force_ascii=False))
+
+
+class DataStore:
+    def __init__(self, check_interval: float = CHECK_INTERVAL, cache_size: int = RESPONSE_CACHE_SIZE):
+        self.check_interval = check_interval
+        self.cache_size = cache_size
+        self.snapshot = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        self.responses_lock = threading.Lock()
+        self.responses = OrderedDict()
+
+    def fetch(self):
+        url = htu_core.plan_sheet_url(htu_core.DATA_URL, htu_core.DATA_COLUMNS)
+        raw = htu_core.fetch_sheet_bytes(url)
+        tlc_raws = []
+        for tlc_url in htu_core.TLC_SHEETS:
+            try:
+                tlc_raws.append((tlc_url, htu_core.fetch_sheet_bytes(tlc_url)))
+            except Exception:
+                continue
+        version = htu_core.sheet_fingerprint(
+            "|".join([htu_core.sheet_fingerprint(raw)] + [htu_core.sheet_fingerprint(r) for _, r in tlc_raws]).encode("utf-8")
+        )
+        return url, raw, tlc_raws, version
+
+    def build(self, url, raw, tlc_raws, version) -> dict:
+        df = htu_core.build_data(url, raw)
+        df_tlc = htu_core.build_tlc_sessions(tlc_raws)
+        return {
+            "version": version,
+            "loaded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "df": df,
+            "df_tlc": df_tlc,
+            "lineage": htu_core.build_course_lineage(df),
+            "search_index": course_query.build_index(df),
+            "rollups": htu_core.compute_rollups(df, df_tlc),
+        }
+
+    def current(self) -> dict:
+        if self.snapshot is not None and time.monotonic() - self.checked_at < self.check_interval:
+            return self.snapshot
+
+        with self.lock:
+            if self.snapshot is None or time.monotonic() - self.checked_at >= self.check_interval:
+                url, raw, tlc_raws, version = self.fetch()
+                if self.snapshot is None or self.snapshot["version"] != version:
+                    self.snapshot = self.build(url, raw, tlc_raws, version)
+                    with self.responses_lock:
+                        self.responses.clear()
+                self.checked_at = time.monotonic()
+        return self.snapshot
+
+    def response(self, path: str, query: dict):
+        # (etag, body) for a request, rendered once per data version.
+        snapshot = self.current()
+        key = (path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+        with self.responses_lock:
+            cached = self.responses.get(key)
+            if cached is not None and cached[0] == snapshot["version"]:
+                self.responses.move_to_end(key)
+                return cached[1], cached[2]
+
+        payload = route(snapshot, path, query)
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.sha256(f"{snapshot['version']}:{key}".encode("utf-8")).hexdigest()[:32] + '"'
+        with self.responses_lock:
+            self.responses[key] = (snapshot["version"], etag, body)
+            self.responses.move_to_end(key)
+            while len(self.responses) > self.cache_size:
+                self.responses.popitem(last=False)
+        return etag, body
+
+
+# ==========================
+# Endpoints
+# ==========================
+
+class NotFound(Exception):
+    pass
+
+
+def first(query: dict, name: str, default=None):
+    values = query.get(name)
+    return values[0] if values else default
+
+
+def meta_payload(snapshot: dict) -> dict:
+    return {
+        "data_version": snapshot["version"],
+        "loaded_at": snapshot["loaded_at"],
+        "courses": int(len(snapshot["df"])),
+        "rollups": sorted(snapshot["rollups"]),
+    }
+
+
+def rollup_payload(snapshot: dict, name: str, query: dict) -> list:
+    if name not in snapshot["rollups"]:
+        raise NotFound(f"Unknown rollup: {name}")
+    df = snapshot["rollups"][name]
+
+    semester = first(query, "semester")
+    if semester and "semester" in df.columns:
+        df = df[df["semester"] == htu_core.normalize_semester_label(semester)]
+    school = first(query, "school")
+    if school and "school" in df.columns:
+        df = df[df["school"] == school]
+    return json_records(df)
+
+
+def course_payload(snapshot: dict, course_name: str) -> dict:
+    course_key = htu_core.normalize_course_name(course_name)
+    df = snapshot["df"]
+    rows = df[df["__course_key__"] == course_key]
+    if rows.empty:
+        raise NotFound(f"Unknown course: {course_name}")
+    return {
+        "course": htu_core.clean_text_value(rows["Course \\ pathway"].iloc[0]),
+        "rows": json_records(rows),
+        "history": htu_core.get_course_history(snapshot["lineage"], course_name),
+    }
+
+
+def instructor_payload(snapshot: dict, instructor: str) -> dict:
+    df_i = htu_core.instructor_courses(snapshot["df"], instructor)
+    tlc_match = htu_core.match_tlc_sessions(snapshot["df_tlc"], instructor)
+    if df_i.empty and tlc_match.empty:
+        raise NotFound(f"Unknown instructor: {instructor}")
+    tlc = htu_core.tlc_session_status(tlc_match) if not tlc_match.empty else {}
+
+    courses = []
+    for _, r in df_i.iterrows():
+        do_worked, worked_blocks = htu_core.instructor_worked_cells(r, instructor)
+        progress = r.get("Progress %")
+        courses.append({
+            "semester": htu_core.clean_text_value(r.get("Semester", "")),
+            "school": htu_core.clean_text_value(r.get("School", "")),
+            "department": htu_core.clean_text_value(r.get("Department", "")),
+            "course": htu_core.clean_text_value(r.get("Course \\ pathway", "")),
+            "progress": None if pd.isna(progress) else float(progress),
+            "detailed_outline": do_worked,
+            "blocks": worked_blocks,
+            "notes": htu_core.clean_text_value(r.get("Notes", "")) if do_worked or worked_blocks else "",
+        })
+
+    return {
+        "instructor": instructor,
+        "courses": courses,
+        "tlc_sessions": tlc,
+        "tlc_completed": sum(tlc.values()),
+        "tlc_total": len(tlc),
+    }
+
+
+def search_payload(snapshot: dict, query: dict) -> dict:
+    df = course_query.search_courses(
+        snapshot["df"],
+        first(query, "q", ""),
+        semester=first(query, "semester"),
+        school=first(query, "school"),
+        index=snapshot["search_index"],
+    )
+    limit = int(first(query, "limit", SEARCH_LIMIT))
+    cols = [c for c in htu_core.SEARCH_RESULT_COLUMNS if c in df.columns]
+    return {"total": int(len(df)), "results": json_records(df[cols].head(limit))}
+
+
+def route(snapshot: dict, path: str, query: dict):
+    parts = [unquote(p) for p in path.strip("/").split("/")]
+    if parts[0] != "api" or len(parts) < 2:
+        raise NotFound(path)
+
+    if parts[1:] == ["meta"]:
+        return meta_payload(snapshot)
+    if parts[1:] == ["search"]:
+        return search_payload(snapshot, query)
+    if len(parts) == 3 and parts[1] == "rollups":
+        return rollup_payload(snapshot, parts[2], query)
+    if len(parts) == 3 and parts[1] == "courses":
+        return course_payload(snapshot, parts[2])
+    if len(parts) == 3 and parts[1] == "instructors":
+        return instructor_payload(snapshot, parts[2])
+    raise NotFound(path)
+
+
+# ==========================
+# Server
+# ==========================
+
+def make_handler(store: DataStore):
+    class ApiHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def send_json(self, status: int, body: bytes, etag: str = None):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            if etag:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == "/metrics":
+                body = htu_metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            try:
+                etag, body = store.response(parsed.path, parse_qs(parsed.query))
+            except NotFound as e:
+                self.send_json(404, json.dumps({"error": f"Not found: {e}"}).encode("utf-8"))
+                return
+            except ValueError as e:
+                self.send_json(400, json.dumps({"error": str(e)}).encode("utf-8"))
+                return
+            except Exception as e:
+                self.send_json(503, json.dumps({"error": f"Data unavailable: {e}"}).encode("utf-8"))
+                return
+
+            if etag in self.headers.get("If-None-Match", ""):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_json(200, body, etag)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ApiHandler
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8700, check_interval: float = CHECK_INTERVAL) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((host, port), make_handler(DataStore(check_interval)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the dashboard rollups as a local JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--check-interval", type=float, default=CHECK_INTERVAL,
+                        help="Seconds between data version checks.")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.check_interval)
+    print(f"Serving the HTU API on http://{args.host}:{args.port}/api/meta")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,988 @@
+import io
+import os
+import re
+import json
+import hashlib
+import urllib.parse
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import htu_metrics
+import shared_cache
+import sheet_client
+import snapshot_store
+
+# ==========================
+# HTU course-plan core
+# ==========================
+# Everything the dashboard computes, without Streamlit: sheet fetching,
+# parsing, progress scoring, semester normalization, TLC merge, instructor
+# reports and rollups. HTU_Blended_Courses_Plan.py wraps these in its caches
+# and renders them; htu_rollups.py runs them headless.
+
+# Loaded frames are shared read-only across sessions, so every filtered view
+# must be copy-on-write rather than an eager .copy().
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# ===========================
+# URLs
+# ===========================
+# ===========================
+
+# Overridable so the app can be pointed at a local gviz emulator (gviz_emulator.py).
+SHEETS_HOST = os.environ.get("HTU_SHEETS_HOST", "https://docs.google.com").rstrip("/")
+
+DATA_URL = f"{SHEETS_HOST}/spreadsheets/d/1EL31srR2r_CXmSXEjGprdWCH3HByT5HLGFlsEhImBBM/gviz/tq?tqx=out:csv&sheet=2013"
+
+TLC_SHEETS = [
+    f"{SHEETS_HOST}/spreadsheets/d/1y7mPQzNxkGXMKqBVEk1X_icALvotanOkL3HL885sMAY/gviz/tq?tqx=out:csv&gid=0",
+    f"{SHEETS_HOST}/spreadsheets/d/1Ksh_5KUAyuE_H_rJkf0vDRvSKJxvyt2sYSzDgLwR5Nw/gviz/tq?tqx=out:csv&gid=0",
+    f"{SHEETS_HOST}/spreadsheets/d/1bRHPX7vvU49A0Q_WzaKhNwhjqS9ketpEJKU64GLSIuM/gviz/tq?tqx=out:csv&gid=0",
+    f"{SHEETS_HOST}/spreadsheets/d/1B5o0uBdFrR-pGT9dxStLorAgWx3XUYyN6I-yiBZlMcc/gviz/tq?tqx=out:csv&gid=0",
+]
+
+# ==========================
+# Helpers
+# ==========================
+
+def is_filled(x) -> bool:
+    if x is None or (isinstance(x, float) and pd.isna(x)):
+        return False
+    s = str(x).strip()
+    if s == "":
+        return False
+    if s.lower() in {"nan", "none", "null"}:
+        return False
+    return True
+
+
+def clean_text_value(x) -> str:
+    if x is None or (isinstance(x, float) and pd.isna(x)):
+        return ""
+    s = str(x).strip()
+    if s.lower() in {"nan", "none", "null"}:
+        return ""
+    return s
+
+
+def norm_bool(x) -> bool:
+    if isinstance(x, bool):
+        return x
+    if x is None or (isinstance(x, float) and pd.isna(x)):
+        return False
+    s = str(x).strip().lower()
+    return s in {"true", "yes", "1", "✓", "✔", "✅", "done"}
+
+
+def clean_name(name: str) -> str:
+    n = "" if name is None else str(name)
+    n = n.replace("\n", " ").replace("\r", " ").strip()
+    n = re.sub(r"\s+", " ", n)
+    n = n.strip(" ,;")
+    return n
+
+
+def normalize_person_name(name: str) -> str:
+    n = clean_name(name).lower()
+    n = n.replace("eng.", " ").replace("eng", " ")
+    n = re.sub(r"[^a-z0-9\s]", " ", n)
+    n = re.sub(r"\s+", " ", n).strip()
+    return n
+
+
+def split_instructors(s: str):
+    if s is None or (isinstance(s, float) and pd.isna(s)):
+        return []
+    txt = str(s).replace("\n", ",")
+    parts = [clean_name(p) for p in txt.split(",")]
+    return [p for p in parts if p and p.lower() not in {"nan", "none", "null"}]
+
+
+def instructor_mentioned_in_cell(cell_value, instructor_name: str) -> bool:
+    if not is_filled(cell_value):
+        return False
+    txt = clean_name(str(cell_value)).lower()
+    inst = clean_name(instructor_name).lower()
+    return inst in txt
+
+
+SEMESTER_LABEL_ALIASES = {
+    "spring 24/25": "spring 2024/2025",
+    "spring 2024/25": "spring 2024/2025",
+    "spring 24/2025": "spring 2024/2025",
+    "spring 2024/2025": "spring 2024/2025",
+    "fall 25/26": "fall 2025/2026",
+    "fall 2025/26": "fall 2025/2026",
+    "fall 25/2026": "fall 2025/2026",
+    "fall 2025/2026": "fall 2025/2026",
+    "spring 25/26": "spring 2025/2026",
+    "spring 2025/26": "spring 2025/2026",
+    "spring 25/2026": "spring 2025/2026",
+    "spring 2025/2026": "spring 2025/2026",
+}
+
+
+def normalize_semester_label(s: str) -> str:
+    s = "" if s is None else str(s).strip().lower()
+    s = s.replace("-", " ")
+    s = re.sub(r"\s+", " ", s)
+
+    return SEMESTER_LABEL_ALIASES.get(s, s)
+
+
+# ==========================
+# Manual School Status Numbers
+# ==========================
+# Replace the dummy numbers below with your real numbers later.
+# The keys should match the normalized semester labels and school names in your sheet.
+SCHOOL_STATUS_COUNTS = {
+    "spring 2024/2025": {
+        "SCI": {"Planned to develop": 6, "Developed": 6, "Canceled": 0, "Not completed": 0},
+        "SET": {"Planned to develop": 6, "Developed": 5, "Canceled": 1, "Not completed": 0},
+        "SBEE": {"Planned to develop": 8, "Developed": 2, "Canceled": 6, "Not completed": 0},
+        "SSBS": {"Planned to develop": 9, "Developed": 7, "Canceled": 2, "Not completed": 0},
+    },
+    "fall 2025/2026": {
+        "SCI": {"Planned to develop": 6, "Developed": 0, "Canceled": 4, "Not completed": 2},
+        "SET": {"Planned to develop": 9, "Developed": 0, "Canceled": 9, "Not completed": 0},
+        "SBEE": {"Planned to develop": 9, "Developed": 0, "Canceled": 0, "Not completed": 1},
+        "SSBS": {"Planned to develop": 7, "Developed": 3, "Canceled": 4, "Not completed": 0},
+    },
+    "spring 2025/2026": {
+        "SCI": {"Planned to develop": 9, "Developed": 5, "Canceled": 2, "Not completed": 2},
+        "SET": {"Planned to develop": 11, "Developed": 2, "Canceled": 3, "Not completed": 6},
+        "SBEE": {"Planned to develop": 7, "Developed": 2, "Canceled": 2, "Not completed": 3},
+        "SSBS": {"Planned to develop": 9, "Developed": 5, "Canceled": 1, "Not completed": 3},
+    },
+}
+
+
+# ==========================
+# Manual Semester Developed Counts
+# ==========================
+# Replace these dummy numbers with the correct numbers later.
+SEMESTER_DEVELOPED_COUNTS = {
+    "spring 2024/2025": {"developed": 20, "total": 29},
+    "fall 2025/2026": {"developed": 3, "total": 31},
+    "spring 2025/2026": {"developed": 9, "total": 27},
+}
+
+SEMESTER_ORDER = [
+    "spring 2024/2025",
+    "fall 2025/2026",
+    "spring 2025/2026",
+]
+
+# Date by which a semester's courses are due to be fully developed
+# ("YYYY-MM-DD"); the completion forecast flags courses projected to finish
+# after it. A semester without an entry is due on the first day of its
+# teaching term: fall on September 1 of its first year, spring on February 1
+# and summer on June 1 of its second year. Add an entry to set the real date.
+SEMESTER_DEADLINES = {}
+
+SEMESTER_TERM_STARTS = {"fall": (0, 9), "spring": (1, 2), "summer": (1, 6)}
+
+
+def semester_deadline(semester_key: str):
+    if semester_key in SEMESTER_DEADLINES:
+        return SEMESTER_DEADLINES[semester_key]
+    m = re.fullmatch(r"(fall|spring|summer) (\d{4})/(\d{4})", semester_key or "")
+    if not m:
+        return None
+    year_offset, month = SEMESTER_TERM_STARTS[m.group(1)]
+    return f"{int(m.group(2)) + year_offset}-{month:02d}-01"
+
+
+def normalize_course_name(name: str) -> str:
+    n = clean_text_value(name).lower()
+    n = n.replace("\u00a0", " ")
+    n = n.replace("&", "and")
+    n = re.sub(r"[^a-z0-9\s]", " ", n)
+    n = re.sub(r"\s+", " ", n).strip()
+    return n
+
+
+def get_previous_semester_key(current_semester_key: str):
+    if current_semester_key not in SEMESTER_ORDER:
+        return None
+    idx = SEMESTER_ORDER.index(current_semester_key)
+    if idx == 0:
+        return None
+    return SEMESTER_ORDER[idx - 1]
+
+
+def build_course_lineage(df_all: pd.DataFrame) -> dict:
+    # course key -> {semester key -> snapshot}, semesters kept in SEMESTER_ORDER
+    order = {k: i for i, k in enumerate(SEMESTER_ORDER)}
+    d = df_all[["__course_key__", "__semester_key__", "Semester", "School", "Progress %"]]
+    d = d[d["__course_key__"] != ""]
+    d = d.assign(__order__=d["__semester_key__"].map(order).fillna(len(order)))
+    d = d.sort_values("__order__", kind="stable")
+
+    lineage = {}
+    for (course_key, semester_key), g in d.groupby(["__course_key__", "__semester_key__"], sort=False):
+        schools = [s for s in g["School"].unique() if clean_text_value(s) != ""]
+        lineage.setdefault(course_key, {})[semester_key] = {
+            "semester": clean_text_value(g["Semester"].iloc[0]),
+            "schools": schools,
+            "progress": float(g["Progress %"].max()),
+        }
+    return lineage
+
+
+def get_course_history(lineage: dict, course_name: str) -> list:
+    return list(lineage.get(normalize_course_name(course_name), {}).values())
+
+
+def is_course_deferred_from_previous_semester(lineage: dict, current_semester_key: str, course_name: str) -> bool:
+    previous_key = get_previous_semester_key(current_semester_key)
+    if previous_key is None:
+        return False
+
+    return previous_key in lineage.get(normalize_course_name(course_name), {})
+
+
+# ==========================
+# Sheet Fingerprints
+# ==========================
+# Each fetched sheet is hashed as raw bytes (data version) and per row. The last
+# seen hashes live in a small manifest on disk together with a bounded history
+# of row-level diffs, so derived caches are rebuilt only when content changes.
+# Only unfiltered fetches are recorded, keyed by the sheet rather than the
+# planned query URL, so one edit is one change; the manifest is updated under
+# a shared_cache lock.
+
+SHEET_REFRESH_SECONDS = 300
+MANIFEST_PATH = os.path.join(".cache", "sheet_manifest.json")
+MANIFEST_HISTORY = 50
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def sheet_fingerprint(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def row_fingerprints(df: pd.DataFrame, key_cols: list) -> dict:
+    keys = df[key_cols[0]].astype(str)
+    if len(key_cols) > 1:
+        keys = keys.str.cat(df[key_cols[1:]].astype(str), sep=" | ")
+    # Duplicate keys are kept apart by their occurrence number.
+    keys = keys + "#" + keys.groupby(keys).cumcount().astype(str)
+    hashes = pd.util.hash_pandas_object(df.astype(str), index=False)
+    return dict(zip(keys, (f"{h:016x}" for h in hashes)))
+
+
+def diff_row_fingerprints(old_rows: dict, new_rows: dict) -> dict:
+    return {
+        "added": sorted(new_rows.keys() - old_rows.keys()),
+        "removed": sorted(old_rows.keys() - new_rows.keys()),
+        "changed": sorted(k for k in new_rows.keys() & old_rows.keys() if new_rows[k] != old_rows[k]),
+    }
+
+
+def load_manifest() -> dict:
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault("sources", {})
+    manifest.setdefault("changes", [])
+    return manifest
+
+
+def save_manifest(manifest: dict):
+    try:
+        shared_cache.write_atomic(MANIFEST_PATH, json.dumps(manifest).encode("utf-8"))
+    except OSError:
+        pass
+
+
+def manifest_source(url: str):
+    # The sheet a fetch is recorded under, or None for semester-filtered views.
+    tq = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query).get("tq", [""])[0]
+    return None if " where " in f" {tq.lower()} " else sheet_client.source_key(url)
+
+
+def record_sheet_fingerprint(url: str, raw: bytes, df: pd.DataFrame, key_cols: list) -> dict:
+    source = manifest_source(url)
+    if source is None:
+        return None
+    with shared_cache.locked("sheet_manifest"):
+        return update_manifest(source, raw, df, key_cols)
+
+
+def update_manifest(source: str, raw: bytes, df: pd.DataFrame, key_cols: list) -> dict:
+    manifest = load_manifest()
+    entry = manifest["sources"].get(source, {})
+    fingerprint = sheet_fingerprint(raw)
+
+    diff = {
+        "source": source,
+        "fingerprint": fingerprint,
+        "previous": entry.get("fingerprint"),
+        "checked_at": utc_now_iso(),
+        "changed": entry.get("fingerprint") != fingerprint,
+    }
+    if not diff["changed"]:
+        return diff
+
+    rows = row_fingerprints(df, key_cols)
+    diff.update(diff_row_fingerprints(entry.get("rows", {}), rows))
+
+    manifest["sources"][source] = {"fingerprint": fingerprint, "rows": rows, "updated_at": diff["checked_at"]}
+    manifest["changes"] = (manifest["changes"] + [diff])[-MANIFEST_HISTORY:]
+    save_manifest(manifest)
+    return diff
+
+
+def get_sheet_changes(since: datetime = None) -> list:
+    changes = load_manifest()["changes"]
+    if since is None:
+        return changes
+    return [c for c in changes if datetime.fromisoformat(c["checked_at"]) >= since]
+
+
+# ==========================
+# Sheet Fetching
+# ==========================
+
+def sheet_label(url: str) -> str:
+    # Short metrics label: "courses", "tlc1".."tlc4" or "other".
+    source = sheet_client.source_key(url)
+    if source == sheet_client.source_key(DATA_URL):
+        return "courses"
+    for i, tlc_url in enumerate(TLC_SHEETS, start=1):
+        if source == sheet_client.source_key(tlc_url):
+            return f"tlc{i}"
+    return "other"
+
+
+def fetch_live_sheet_bytes(url: str) -> bytes:
+    # Replicas on this host share one download per refresh window.
+    with htu_metrics.SHEET_FETCH_SECONDS.time(sheet=sheet_label(url)):
+        return shared_cache.get_or_fetch_bytes(url, sheet_client.fetch_bytes, max_age=SHEET_REFRESH_SECONDS)
+
+
+def fetch_sheet_bytes(url: str, stale: dict = None, fetch_live=None) -> bytes:
+    # Falls back to the last-known-good copy; `stale` collects url -> as-of
+    # datetime (None when no copy exists) for every fallback taken.
+    try:
+        return (fetch_live or fetch_live_sheet_bytes)(url)
+    except Exception:
+        htu_metrics.SHEET_FETCH_ERRORS.inc(sheet=sheet_label(url))
+        snapshot = sheet_client.last_known_good(url)
+        if stale is not None:
+            stale[url] = None if snapshot is None else snapshot[1]
+        if snapshot is None:
+            raise
+        return snapshot[0]
+
+
+# ==========================
+# gviz Query Planner
+# ==========================
+# The gviz endpoint accepts a `tq` query, so column projection and semester
+# filtering happen on Google's side instead of after downloading the whole
+# sheet. gviz refers to columns by letter, so the header is fetched first
+# (a header-only query, cached like any other fetch).
+
+COURSE_COLUMN_ALIASES = [
+    "Course \\ pathway",
+    "Course \\\\ pathway",
+    "Course / pathway",
+    "Course pathway",
+    "Course \\pathway",
+    "Course  pathway",
+]
+
+
+def column_letter(i: int) -> str:
+    letters = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        letters = chr(ord("A") + r) + letters
+    return letters
+
+
+def with_gviz_query(url: str, tq: str) -> str:
+    return f"{url}&tq={urllib.parse.quote(tq)}"
+
+
+def header_query_url(url: str) -> str:
+    return with_gviz_query(url, "select * limit 0")
+
+
+def fetch_sheet_header(url: str, fetch=None) -> list:
+    raw = (fetch or fetch_sheet_bytes)(header_query_url(url))
+    return [str(c).strip() for c in pd.read_csv(io.BytesIO(raw), nrows=0).columns]
+
+
+def semester_match_pattern(semester_keys) -> str:
+    labels = set(semester_keys)
+    labels.update(alias for alias, key in SEMESTER_LABEL_ALIASES.items() if key in labels)
+    # normalize_semester_label treats "-" and runs of whitespace as one space.
+    parts = sorted(re.escape(label).replace("\\ ", "[\\s-]+") for label in labels)
+    return "\\s*(" + "|".join(parts) + ")\\s*"
+
+
+def build_gviz_query(header: list, columns=None, semester_keys=None) -> str:
+    letters = {name: column_letter(i) for i, name in enumerate(header)}
+
+    if columns is None:
+        select = "*"
+    else:
+        wanted = set(columns)
+        if wanted & set(COURSE_COLUMN_ALIASES):
+            wanted.update(COURSE_COLUMN_ALIASES)
+        select = ", ".join(letters[name] for name in header if name in wanted) or "*"
+
+    query = f"select {select}"
+    if semester_keys and "Semester" in letters:
+        pattern = semester_match_pattern(semester_keys)
+        query += f" where lower({letters['Semester']}) matches '{pattern}'"
+    return query
+
+
+def plan_sheet_url(url: str, columns=None, semester_keys=None, fetch=None) -> str:
+    if columns is None and not semester_keys:
+        return url
+    try:
+        header = fetch_sheet_header(url, fetch)
+    except Exception:
+        return url
+    if not header:
+        return url
+    return with_gviz_query(url, build_gviz_query(header, columns, semester_keys))
+
+
+def fetch_column_values(url: str, column: str, fetch=None) -> list:
+    # Distinct non-empty values of one column, fetched as a one-column query.
+    fetch = fetch or fetch_sheet_bytes
+    header = fetch_sheet_header(url, fetch)
+    if column not in header:
+        return []
+    raw = fetch(with_gviz_query(url, build_gviz_query(header, [column])))
+    values = pd.read_csv(io.BytesIO(raw), dtype=str, keep_default_na=False).iloc[:, 0]
+    return sorted({v.strip() for v in values if v.strip()})
+
+
+# ==========================
+# Progress Policy
+# ==========================
+# A course's Progress % is its completion matrix row times a weight vector:
+# each task carries PROGRESS_WEIGHTS[task] (normalized to sum to 1), and a
+# cell that only says the task is started (PARTIAL_TOKENS) earns
+# PARTIAL_CREDIT of that weight. The defaults are the original rule: 20% for
+# the Detailed Outline, 80% spread over the 15 blocks, any filled cell done.
+
+TASK_COLUMNS = ["Detailed Outline"] + [f"Block {i}" for i in range(1, 16)]
+
+PROGRESS_WEIGHTS = {"Detailed Outline": 0.20, **{f"Block {i}": 0.80 / 15 for i in range(1, 16)}}
+PARTIAL_TOKENS = ["in progress", "partial", "started", "wip", "draft", "ongoing"]
+PARTIAL_CREDIT = 1.0
+
+
+def task_cells(df: pd.DataFrame) -> pd.DataFrame:
+    cells = df.reindex(columns=TASK_COLUMNS).fillna("").astype(str)
+    return cells.apply(lambda c: c.str.strip().str.lower())
+
+
+def completion_matrix(df: pd.DataFrame):
+    # courses x TASK_COLUMNS boolean array, is_filled() for every cell at once
+    return ~task_cells(df).isin(["", "nan", "none", "null"]).to_numpy()
+
+
+def partial_matrix(df: pd.DataFrame):
+    # courses x TASK_COLUMNS, cells marked as started but not finished
+    return task_cells(df).isin(PARTIAL_TOKENS).to_numpy()
+
+
+def weight_vector(weights: dict = None):
+    weights = PROGRESS_WEIGHTS if weights is None else weights
+    w = np.array([float(weights.get(task, 0.0)) for task in TASK_COLUMNS])
+    total = w.sum()
+    return w / total if total > 0 else w
+
+
+def progress_scores(done, partial, weights, partial_credit: float = PARTIAL_CREDIT):
+    # Progress % for every course: one matrix-vector product.
+    credit = done.astype(float) - partial * (1.0 - partial_credit)
+    return credit @ weights * 100.0
+
+
+# ==========================
+# Courses Data
+# ==========================
+
+SEARCHABLE_COLS = [
+    "Course \\ pathway",
+    "SMEs",
+    "ID",
+    "Notes",
+    "Department",
+    "School",
+    "Semester",
+    "Development Stage",
+]
+
+DATA_COLUMNS = [
+    "Semester",
+    "School",
+    "Department",
+    "Course \\ pathway",
+    "Development Stage",
+    "Dept. Head",
+    "SMEs",
+    "ID",
+    "Detailed Outline",
+    "Notes",
+] + [f"Block {i}" for i in range(1, 16)]
+
+# Parsed as stripped strings with "nan"/"None"/"null" already blanked.
+DATA_SCHEMA = {c: "text" for c in DATA_COLUMNS + COURSE_COLUMN_ALIASES}
+
+# Enough to compute progress and place a course in a semester/school.
+LINEAGE_COLUMNS = ["Semester", "School", "Course \\ pathway", "Detailed Outline"] + [f"Block {i}" for i in range(1, 16)]
+
+
+def build_data(url: str, raw: bytes) -> pd.DataFrame:
+    with htu_metrics.SHEET_PARSE_SECONDS.time(sheet="courses"):
+        df = sheet_client.read_sheet_csv(raw, DATA_SCHEMA)
+
+    for possible in COURSE_COLUMN_ALIASES:
+        if possible in df.columns and possible != "Course \\ pathway":
+            df = df.rename(columns={possible: "Course \\ pathway"})
+
+    # Projections without the stage column (e.g. LINEAGE_COLUMNS) would record
+    # blank stages into the progress history.
+    full_view = "Development Stage" in df.columns
+
+    base_text_cols = [
+        "Semester",
+        "School",
+        "Department",
+        "Course \\ pathway",
+        "Development Stage",
+        "Dept. Head",
+        "SMEs",
+        "ID",
+    ]
+    for col in base_text_cols:
+        if col not in df.columns:
+            df[col] = ""
+
+    if "Detailed Outline" not in df.columns:
+        df["Detailed Outline"] = ""
+
+    for i in range(1, 16):
+        c = f"Block {i}"
+        if c not in df.columns:
+            df[c] = ""
+
+    if "Notes" not in df.columns:
+        df["Notes"] = ""
+
+    if full_view:
+        record_sheet_fingerprint(url, raw, df, ["Semester", "School", "Course \\ pathway"])
+
+    df["Progress %"] = progress_scores(completion_matrix(df), partial_matrix(df), weight_vector())
+    df["__semester_key__"] = df["Semester"].apply(normalize_semester_label)
+    df["__course_key__"] = df["Course \\ pathway"].apply(normalize_course_name)
+    df["__search_text__"] = df[SEARCHABLE_COLS[0]].str.cat(df[SEARCHABLE_COLS[1:]], sep=" | ").str.lower()
+
+    if full_view:
+        try:
+            snapshot_store.record_snapshot(df, sheet_fingerprint(raw))
+        except Exception:
+            pass
+
+    return df
+
+
+def block_completion(df: pd.DataFrame, matrix, by: list) -> pd.DataFrame:
+    # % of courses with each task done per group of `by`, plus a "Courses"
+    # count; reduced from the completion matrix with one scatter-add.
+    keys = df[by].fillna("")
+    codes, groups = pd.factorize(pd.MultiIndex.from_frame(keys))
+    if len(by) == 1:
+        groups = groups.get_level_values(0)
+    counts = np.bincount(codes, minlength=len(groups))
+    done = np.zeros((len(groups), matrix.shape[1]))
+    np.add.at(done, codes, matrix)
+
+    out = pd.DataFrame(done / counts[:, None] * 100.0, index=groups, columns=TASK_COLUMNS)
+    out.insert(0, "Courses", counts)
+    return out.sort_index()
+
+
+def read_courses(semester_keys: tuple = None, columns: tuple = None, fetch=None) -> pd.DataFrame:
+    fetch = fetch or fetch_sheet_bytes
+    url = plan_sheet_url(DATA_URL, columns or DATA_COLUMNS, semester_keys, fetch)
+    return build_data(url, fetch(url))
+
+
+SEARCH_RESULT_COLUMNS = [
+    "Semester",
+    "School",
+    "Department",
+    "Course \\ pathway",
+    "SMEs",
+    "ID",
+    "Development Stage",
+    "Progress %",
+    "Notes",
+]
+
+
+# ==========================
+# Course Key Index
+# ==========================
+# A course row is identified by (semester key, school, department,
+# normalized course name). The index maps each key to the position of its
+# first row, so detail views fetch a row with one dict lookup; keys that
+# occur more than once are listed in the duplicates report instead of being
+# silently collapsed.
+
+DUPLICATE_COLUMNS = ["semester", "school", "department", "course", "copies", "progress"]
+
+
+def course_key(semester_key: str, school, department, course) -> tuple:
+    return (
+        semester_key,
+        clean_text_value(school).lower(),
+        clean_text_value(department).lower(),
+        normalize_course_name(course),
+    )
+
+
+def course_keys(df: pd.DataFrame, semester_key: str = None) -> list:
+    # semester_key stands in for __semester_key__ on single-semester sheets
+    semesters = df["__semester_key__"] if semester_key is None else [semester_key] * len(df)
+    return [
+        course_key(sem, school, dept, course)
+        for sem, school, dept, course in zip(semesters, df["School"], df["Department"], df["Course \\ pathway"])
+    ]
+
+
+def build_course_index(df: pd.DataFrame, semester_key: str = None) -> dict:
+    keys = course_keys(df, semester_key)
+    positions, copies = {}, {}
+    for pos, key in enumerate(keys):
+        if key in positions:
+            copies[key] = copies.get(key, 1) + 1
+        else:
+            positions[key] = pos
+
+    dup = [pos for pos, key in enumerate(keys) if key in copies]
+    rows = df.iloc[dup]
+    progress = rows["Progress %"] if "Progress %" in rows.columns else pd.Series(np.nan, index=rows.index)
+    duplicates = pd.DataFrame({
+        "key": [keys[pos] for pos in dup],
+        "semester": [keys[pos][0] for pos in dup],
+        "school": rows["School"].map(clean_text_value).to_numpy(),
+        "department": rows["Department"].map(clean_text_value).to_numpy(),
+        "course": rows["Course \\ pathway"].map(clean_text_value).to_numpy(),
+        "progress": progress.map(lambda v: "—" if pd.isna(v) else f"{float(v):.1f}%").to_numpy(),
+    })
+    duplicates = (
+        duplicates.groupby("key", sort=False)
+        .agg(
+            semester=("semester", "first"),
+            school=("school", "first"),
+            department=("department", "first"),
+            course=("course", "first"),
+            copies=("course", "size"),
+            progress=("progress", ", ".join),
+        )
+        .reset_index(drop=True)
+        .reindex(columns=DUPLICATE_COLUMNS)
+    )
+
+    return {"positions": positions, "copies": copies, "semester_key": semester_key, "duplicates": duplicates}
+
+
+def lookup_course(index: dict, df: pd.DataFrame, school, department, course, semester_key: str = None):
+    # (first row for the key or None, number of rows sharing the key)
+    key = course_key(index["semester_key"] if semester_key is None else semester_key, school, department, course)
+    pos = index["positions"].get(key)
+    if pos is None:
+        return None, 0
+    return df.iloc[pos], index["copies"].get(key, 1)
+
+
+# ==========================
+# TLC Sessions Data
+# ==========================
+
+def build_tlc_sessions(raws: list) -> pd.DataFrame:
+    frames = []
+
+    for url, raw in raws:
+        try:
+            with htu_metrics.SHEET_PARSE_SECONDS.time(sheet=sheet_label(url)):
+                d = sheet_client.read_sheet_csv(raw, {}, project=False)
+        except Exception:
+            continue
+        htu_metrics.SHEET_ROWS.set(len(d), sheet=sheet_label(url))
+
+        if d.empty and len(d.columns) == 0:
+            continue
+
+        name_col = None
+        for c in d.columns:
+            if c.strip().lower() in {"instructor name", "istructor name", "instructor", "name"}:
+                name_col = c
+                break
+
+        if name_col is None:
+            name_col = d.columns[0]
+
+        d = d.rename(columns={name_col: "Instructor Name"})
+        record_sheet_fingerprint(url, raw, d, ["Instructor Name"])
+
+        for c in d.columns:
+            if c == "Instructor Name":
+                continue
+            d[c] = sheet_client.to_bool(d[c])
+
+        d["__name_key__"] = d["Instructor Name"].apply(normalize_person_name)
+        frames.append(d)
+
+    if not frames:
+        return pd.DataFrame(columns=["Instructor Name", "__name_key__"])
+
+    all_df = pd.concat(frames, ignore_index=True)
+
+    session_cols = [
+        c for c in all_df.columns
+        if c not in {"Instructor Name", "__name_key__"}
+        and str(c).strip() != ""
+        and not str(c).strip().lower().startswith("unnamed")
+    ]
+
+    def first_non_empty(values):
+        for v in values:
+            if is_filled(v):
+                return v
+        return values[0] if values else ""
+
+    grouped = all_df.groupby("__name_key__", dropna=False)
+    out_rows = []
+
+    for key, g in grouped:
+        row = {
+            "__name_key__": key,
+            "Instructor Name": first_non_empty(g["Instructor Name"].tolist()),
+        }
+        for c in session_cols:
+            row[c] = bool(g[c].fillna(False).astype(bool).any())
+        out_rows.append(row)
+
+    return pd.DataFrame(out_rows)
+
+
+def read_tlc_sessions(fetch=None) -> pd.DataFrame:
+    fetch = fetch or fetch_sheet_bytes
+    raws = []
+    for url in TLC_SHEETS:
+        try:
+            raws.append((url, fetch(url)))
+        except Exception:
+            continue
+    return build_tlc_sessions(raws)
+
+
+# ==========================
+# Instructors
+# ==========================
+
+def instructor_courses(df: pd.DataFrame, instructor: str) -> pd.DataFrame:
+    return df[df["SMEs"].apply(lambda v: instructor in split_instructors(v))]
+
+
+def instructor_worked_cells(row: pd.Series, instructor: str):
+    # (worked on Detailed Outline, list of worked block names)
+    do_worked = instructor_mentioned_in_cell(row.get("Detailed Outline", ""), instructor)
+    worked_blocks = [
+        f"Block {i}" for i in range(1, 16)
+        if instructor_mentioned_in_cell(row.get(f"Block {i}", ""), instructor)
+    ]
+    return do_worked, worked_blocks
+
+
+def match_tlc_sessions(df_tlc: pd.DataFrame, instructor: str) -> pd.DataFrame:
+    instructor_key = normalize_person_name(instructor)
+    tlc_match = df_tlc[df_tlc["__name_key__"] == instructor_key]
+
+    if tlc_match.shape[0] == 0 and df_tlc.shape[0] > 0:
+        tlc_match = df_tlc[df_tlc["__name_key__"].astype(str).str.contains(re.escape(instructor_key), na=False)]
+        if tlc_match.shape[0] == 0:
+            tlc_match = df_tlc[
+                df_tlc["__name_key__"].apply(
+                    lambda x: instructor_key in str(x) or str(x) in instructor_key
+                )
+            ]
+    return tlc_match
+
+
+def tlc_session_status(tlc_match: pd.DataFrame) -> dict:
+    # session name -> completed, merged across every matching TLC row
+    session_cols = [
+        c for c in tlc_match.columns
+        if c not in {"Instructor Name", "__name_key__"}
+        and str(c).strip() != ""
+        and not str(c).strip().lower().startswith("unnamed")
+    ]
+    return {c: bool(tlc_match[c].fillna(False).astype(bool).any()) for c in session_cols}
+
+
+# ==========================
+# Rollups
+# ==========================
+
+def school_summary(df: pd.DataFrame) -> pd.DataFrame:
+    # School -> course count, mean Progress % and one count column per
+    # Development Stage, in one groupby; schools keep first-seen order.
+    # Rows with a blank School are left out, whether parsed as NaN or "".
+    df = df[df["School"].fillna("").astype(str).str.strip() != ""]
+    out = df.groupby("School", sort=False).agg(
+        courses=("Progress %", "size"),
+        avg_progress=("Progress %", "mean"),
+    )
+    if "Development Stage" in df.columns:
+        stages = pd.crosstab(df["School"], df["Development Stage"].fillna(""))
+        out = out.join(stages.reindex(out.index, fill_value=0))
+    return out
+
+
+def semester_rollup(df: pd.DataFrame) -> pd.DataFrame:
+    out = (
+        df.groupby("__semester_key__", sort=False)
+        .agg(courses=("Progress %", "size"), avg_progress=("Progress %", "mean"))
+        .reset_index()
+        .rename(columns={"__semester_key__": "semester"})
+    )
+    counts = out["semester"].map(lambda k: SEMESTER_DEVELOPED_COUNTS.get(k, {}))
+    out["developed"] = counts.map(lambda c: c.get("developed", 0))
+    out["target"] = counts.map(lambda c: c.get("total", 0))
+    return out
+
+
+def school_rollup(df: pd.DataFrame) -> pd.DataFrame:
+    out = (
+        df.groupby(["__semester_key__", "School"], sort=False)
+        .agg(courses=("Progress %", "size"), avg_progress=("Progress %", "mean"))
+        .reset_index()
+        .rename(columns={"__semester_key__": "semester", "School": "school"})
+    )
+    for status in ["Planned to develop", "Developed", "Canceled", "Not completed"]:
+        out[status] = [
+            SCHOOL_STATUS_COUNTS.get(sem, {}).get(school, {}).get(status, 0)
+            for sem, school in zip(out["semester"], out["school"])
+        ]
+    return out
+
+
+def department_rollup(df: pd.DataFrame) -> pd.DataFrame:
+    return (
+        df.groupby(["__semester_key__", "School", "Department"], sort=False)
+        .agg(courses=("Progress %", "size"), avg_progress=("Progress %", "mean"))
+        .reset_index()
+        .rename(columns={"__semester_key__": "semester", "School": "school", "Department": "department"})
+    )
+
+
+ASSIGNMENT_COLUMNS = ["instructor", "semester", "school", "department", "course", "course_row", "progress", "block",
+                      "tlc_completed", "tlc_total"]
+WORKLOAD_COLUMNS = ["instructor", "courses", "semesters", "schools", "departments", "avg_progress",
+                    "outlines", "blocks", "tlc_completed", "tlc_total"]
+
+
+def instructor_tlc_counts(instructors, df_tlc: pd.DataFrame) -> pd.DataFrame:
+    # Completed and total TLC sessions per instructor name, matched once each.
+    # Names with no TLC row get tlc_total 0, so their completion stays NaN.
+    names = pd.unique(pd.Series(instructors, dtype=object))
+    matches = [match_tlc_sessions(df_tlc, name) for name in names]
+    status = [{} if m.empty else tlc_session_status(m) for m in matches]
+    return pd.DataFrame({
+        "instructor": names,
+        "tlc_completed": [sum(t.values()) for t in status],
+        "tlc_total": [len(t) for t in status],
+    })
+
+
+def instructor_assignments(df: pd.DataFrame, df_tlc: pd.DataFrame) -> pd.DataFrame:
+    # Long table: one row per (instructor, course row, task cell naming them),
+    # and one row with an empty block for courses where they worked no cell.
+    # course_row is the position in df, so the same course in two semesters
+    # or departments stays two courses. Each instructor's TLC counts are
+    # matched once here and repeated on their rows.
+    people = pd.DataFrame({
+        "instructor": df["SMEs"].map(split_instructors).to_numpy(),
+        "semester": df["__semester_key__"].to_numpy(),
+        "school": df["School"].fillna("").to_numpy(),
+        "department": df["Department"].fillna("").to_numpy(),
+        "course": df["Course \\ pathway"].fillna("").to_numpy(),
+        "course_row": np.arange(len(df)),
+        "progress": df["Progress %"].to_numpy(dtype=float),
+    }).explode("instructor").dropna(subset=["instructor"])
+    if people.empty:
+        return pd.DataFrame(columns=ASSIGNMENT_COLUMNS)
+
+    inst = people["instructor"].str.lower().to_numpy()
+    cells = task_cells(df).to_numpy()[people["course_row"].to_numpy()]
+    filled = completion_matrix(df)[people["course_row"].to_numpy()]
+    worked = np.array([
+        [f and i in clean_name(c) for c, f in zip(row, done)]
+        for i, row, done in zip(inst, cells, filled)
+    ], dtype=bool).reshape(len(people), len(TASK_COLUMNS))
+
+    hit_rows, hit_tasks = np.nonzero(worked)
+    hits = people.iloc[hit_rows].assign(block=np.array(TASK_COLUMNS)[hit_tasks])
+    idle = people[~worked.any(axis=1)].assign(block="")
+    out = pd.concat([hits, idle], ignore_index=True)
+    out = out.merge(instructor_tlc_counts(out["instructor"], df_tlc), on="instructor", how="left")
+    return out.sort_values(["instructor", "course_row"], kind="stable").reset_index(drop=True)[ASSIGNMENT_COLUMNS]
+
+
+def instructor_workload(assignments: pd.DataFrame) -> pd.DataFrame:
+    # Per instructor totals over any slice of instructor_assignments().
+    if assignments.empty:
+        return pd.DataFrame(columns=WORKLOAD_COLUMNS)
+
+    per_course = assignments.drop_duplicates(["instructor", "course_row"])
+    out = per_course.groupby("instructor", sort=True).agg(
+        courses=("course_row", "nunique"),
+        semesters=("semester", "nunique"),
+        schools=("school", "nunique"),
+        departments=("department", "nunique"),
+        avg_progress=("progress", "mean"),
+        tlc_completed=("tlc_completed", "first"),
+        tlc_total=("tlc_total", "first"),
+    )
+    tasks = assignments["block"]
+    out["outlines"] = (tasks == "Detailed Outline").groupby(assignments["instructor"]).sum()
+    out["blocks"] = tasks.str.startswith("Block").groupby(assignments["instructor"]).sum()
+    return out.reset_index()[WORKLOAD_COLUMNS]
+
+
+def instructor_rollup(df: pd.DataFrame, df_tlc: pd.DataFrame) -> pd.DataFrame:
+    return instructor_workload(instructor_assignments(df, df_tlc))
+
+
+def compute_rollups(df: pd.DataFrame, df_tlc: pd.DataFrame) -> dict:
+    return {
+        "semesters": semester_rollup(df),
+        "schools": school_rollup(df),
+        "departments": department_rollup(df),
+        "instructors": instructor_rollup(df, df_tlc),
+        "duplicates": build_course_index(df)["duplicates"],
+    }
@@ -0,0 +1,213 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==========================
+# Metrics registry
+# ==========================
+# Counters, gauges and histograms kept in process memory and rendered in the
+# Prometheus text format (version 0.0.4). The metrics are defined once here so
+# Streamlit reruns, which re-execute the app script, never register twice.
+# Label values are passed as keyword arguments; keep them low-cardinality
+# (sheet names, cache names, page names).
+#
+#   python -c "import htu_metrics; print(htu_metrics.render())"
+#
+# The app serves them on HTU_METRICS_PORT (see start_server); htu_api.py also
+# answers GET /metrics.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROW_BUCKETS = (0, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{escape_label(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labels)
+
+    def samples(self) -> list:
+        # (suffix, label values, extra label, value)
+        with self.lock:
+            return [("", k, "", v) for k, v in sorted(self.values.items())]
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{format_labels(self.labels, key, extra)} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), function=None):
+        super().__init__(name, help, labels)
+        self.function = function
+
+    def set(self, value: float, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        # Unlabelled gauge read at scrape time.
+        self.function = function
+
+    def samples(self) -> list:
+        if self.function is not None:
+            try:
+                return [("", (), "", float(self.function()))]
+            except Exception:
+                return []
+        return super().samples()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self.key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list:
+        out = []
+        with self.lock:
+            items = sorted((k, (list(c), s)) for k, (c, s) in self.values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                out.append(("_bucket", key, f'le="{format_value(bound)}"', cumulative))
+            out.append(("_sum", key, "", total))
+            out.append(("_count", key, "", cumulative))
+        return out
+
+
+REGISTRY = []
+
+
+def register(metric: Metric) -> Metric:
+    REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# ==========================
+# Metrics
+# ==========================
+
+SHEET_FETCH_SECONDS = register(Histogram(
+    "htu_sheet_fetch_seconds", "Time to get a sheet's bytes (shared cache or download).", ("sheet",)))
+SHEET_FETCH_ERRORS = register(Counter(
+    "htu_sheet_fetch_errors_total", "Sheet fetches that fell back to the last-known-good copy or failed.", ("sheet",)))
+SHEET_PARSE_SECONDS = register(Histogram(
+    "htu_sheet_parse_seconds", "Time to parse a sheet's CSV into a frame.", ("sheet",)))
+SHEET_ROWS = register(Gauge(
+    "htu_sheet_rows", "Rows in the most recently parsed copy of a sheet.", ("sheet",)))
+
+CACHE_REQUESTS = register(Counter(
+    "htu_cache_requests_total", "Lookups of an in-process loader cache.", ("cache",)))
+CACHE_MISSES = register(Counter(
+    "htu_cache_misses_total", "Lookups that had to build the value.", ("cache",)))
+INDEX_BUILD_SECONDS = register(Histogram(
+    "htu_index_build_seconds", "Time to build a derived index or summary.", ("index",)))
+
+PAGE_RENDER_SECONDS = register(Histogram(
+    "htu_page_render_seconds", "Script run time per page.", ("page",)))
+PAGE_ROWS = register(Histogram(
+    "htu_page_rows", "Course rows a page run worked on.", ("page",), ROW_BUCKETS))
+ACTIVE_SESSIONS = register(Gauge(
+    "htu_active_sessions", "Browser sessions whose state this process holds."))
+
+
+# ==========================
+# Exporter
+# ==========================
+
+def make_handler():
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def start_server(host: str = "127.0.0.1", port: int = 9108) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler())
+    threading.Thread(target=server.serve_forever, name="htu-metrics", daemon=True).start()
+    return server
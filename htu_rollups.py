@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+import htu_core
+
+# ==========================
+# Headless rollups
+# ==========================
+# Computes the dashboard's semester, school, department and instructor
+# rollups straight from the sheets, without Streamlit, and writes one file per
+# rollup plus a meta.json with the data version and generation time.
+#
+#   python htu_rollups.py --out rollups --format json
+#   python htu_rollups.py --out rollups --format parquet
+
+
+def write_rollup(df, path: str, fmt: str):
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_json(path, orient="records", force_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute the dashboard rollups without Streamlit.")
+    parser.add_argument("--out", default="rollups", help="Directory to write the rollup files to.")
+    parser.add_argument("--format", choices=["json", "parquet"], default="json")
+    args = parser.parse_args()
+
+    url = htu_core.plan_sheet_url(htu_core.DATA_URL, htu_core.DATA_COLUMNS)
+    raw = htu_core.fetch_sheet_bytes(url)
+    df = htu_core.build_data(url, raw)
+    df_tlc = htu_core.read_tlc_sessions()
+
+    rollups = htu_core.compute_rollups(df, df_tlc)
+
+    os.makedirs(args.out, exist_ok=True)
+    files = {}
+    for name, rollup in rollups.items():
+        path = os.path.join(args.out, f"{name}.{args.format}")
+        write_rollup(rollup, path, args.format)
+        files[name] = os.path.basename(path)
+        print(f"{name:<12} {len(rollup):>5} rows -> {path}")
+
+    meta = {
+        "data_version": htu_core.sheet_fingerprint(raw),
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "courses": int(len(df)),
+        "files": files,
+    }
+    with open(os.path.join(args.out, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+
+import streamlit as st
+
+# ==========================
+# Shared page components
+# ==========================
+# Styling lives in static/htu.css, served by Streamlit's static file server
+# (server.enableStaticServing) together with the logo. The static server sends
+# ETag and Last-Modified, so browsers keep both in their HTTP cache, and each
+# rerun only sends a one-line @import and short class-based HTML.
+#
+# Streamlit drops elements that a rerun does not send again, so the @import
+# is emitted on every run; st.html puts style-only content in the event
+# container, where it takes no space on the page.
+
+STYLESHEET_URL = "app/static/htu.css"
+LOGO_URL = "app/static/htu_logo.png"
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "htu_logo.png")
+
+PHASE_CARDS_HTML = """
+<div class="card-container">
+    <div class="card">
+        <h3>Planning Phase</h3>
+        <p>Establishes the foundation for course development, focusing on the course description, learning objectives, and structure.</p>
+    </div>
+    <div class="card">
+        <h3>Design Phase</h3>
+        <p>Focuses on structuring the course into modules, blocks, and lessons, ensuring alignment with learning objectives and designing engaging content.</p>
+    </div>
+    <div class="card">
+        <h3>Production Phase</h3>
+        <p>Detailed content is developed for each lesson based on the course outline, including materials for video scripts, readings, assignments, and quizzes.</p>
+    </div>
+    <div class="card">
+        <h3>Implementation Phase</h3>
+        <p>The D-Learn Team builds the prepared content into the authoring tool or LMS to create an engaging and seamless learning experience.</p>
+    </div>
+</div>
+"""
+
+FOOTER_HTML = '<div class="footer">Made By: The D. Learn Center at HTU</div>'
+
+
+def inject_stylesheet():
+    st.html(f'<style>@import url("{STYLESHEET_URL}");</style>')
+
+
+def render_logo():
+    if not os.path.exists(LOGO_PATH):
+        st.sidebar.markdown("### HTU")
+        return
+    st.sidebar.markdown(f'<img class="htu-logo" src="{LOGO_URL}" alt="HTU">', unsafe_allow_html=True)
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, each replica may fetch
+    fcntl = None
+
+# ==========================
+# Cross-replica shared cache
+# ==========================
+# Every Streamlit replica on the host points at the same directory. Raw sheet
+# downloads are stored with their fetch time, processed frames as Arrow IPC
+# files named by data version. A small JSON manifest per entry says which file
+# is current, and an flock per entry makes sure only one replica fetches or
+# builds while the others wait and then read its result. Frames are opened
+# through a memory map, so loading them costs little more than the page-ins.
+
+SHARED_CACHE_DIR = os.environ.get("HTU_SHARED_CACHE_DIR", os.path.join(".cache", "shared"))
+
+
+def entry_id(name: str) -> str:
+    return hashlib.sha256(name.encode("utf-8")).hexdigest()[:32]
+
+
+def entry_path(name: str, suffix: str) -> str:
+    return os.path.join(SHARED_CACHE_DIR, entry_id(name) + suffix)
+
+
+@contextmanager
+def locked(name: str):
+    os.makedirs(SHARED_CACHE_DIR, exist_ok=True)
+    with open(entry_path(name, ".lock"), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def try_lock(name: str):
+    # Non-blocking exclusive lock held until the returned file is closed;
+    # None when another process holds it.
+    os.makedirs(SHARED_CACHE_DIR, exist_ok=True)
+    f = open(entry_path(name, ".lock"), "a")
+    if fcntl is None:
+        return f
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+def write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(name: str):
+    try:
+        with open(entry_path(name, ".json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(name: str, manifest: dict):
+    write_atomic(entry_path(name, ".json"), json.dumps(manifest).encode("utf-8"))
+
+
+# ==========================
+# Raw sheet bytes
+# ==========================
+
+def get_bytes(name: str, max_age: float):
+    manifest = read_manifest(name)
+    if manifest is None or time.time() - manifest.get("written_at", 0) > max_age:
+        return None
+    try:
+        with open(manifest["path"], "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def put_bytes(name: str, raw: bytes):
+    path = entry_path(name, ".bin")
+    write_atomic(path, raw)
+    write_manifest(name, {
+        "name": name,
+        "path": path,
+        "sha256": hashlib.sha256(raw).hexdigest(),
+        "written_at": time.time(),
+    })
+
+
+def bytes_digest(name: str):
+    manifest = read_manifest(name)
+    return None if manifest is None else manifest.get("sha256")
+
+
+def put_bytes_if_changed(name: str, raw: bytes) -> bool:
+    # Rewrites the entry only when its content changed; an unchanged entry
+    # just has its fetch time renewed. Returns whether the content changed.
+    manifest = read_manifest(name)
+    digest = hashlib.sha256(raw).hexdigest()
+    if manifest is None or manifest.get("sha256") != digest or not os.path.exists(manifest.get("path", "")):
+        put_bytes(name, raw)
+        return True
+    write_manifest(name, dict(manifest, written_at=time.time()))
+    return False
+
+
+def expire_bytes(name: str):
+    # The entry stays readable as a file, but the next get_or_fetch_bytes
+    # downloads it again.
+    manifest = read_manifest(name)
+    if manifest is not None:
+        write_manifest(name, dict(manifest, written_at=0))
+
+
+def get_or_fetch_bytes(name: str, fetch, max_age: float) -> bytes:
+    raw = get_bytes(name, max_age)
+    if raw is not None:
+        return raw
+
+    with locked(name):
+        # Another replica may have fetched while this one waited for the lock.
+        raw = get_bytes(name, max_age)
+        if raw is None:
+            raw = fetch(name)
+            try:
+                put_bytes(name, raw)
+            except OSError:
+                pass
+    return raw
+
+
+# ==========================
+# Processed frames
+# ==========================
+
+def get_frame(name: str, version: str):
+    manifest = read_manifest(name)
+    if manifest is None or manifest.get("version") != version:
+        return None
+    try:
+        with pa.memory_map(manifest["path"], "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return table.to_pandas()
+
+
+def put_frame(name: str, version: str, df: pd.DataFrame):
+    path = entry_path(name, f"-{version[:16]}.arrow")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    write_atomic(path, sink.getvalue().to_pybytes())
+
+    previous = read_manifest(name)
+    write_manifest(name, {"name": name, "version": version, "path": path, "written_at": time.time()})
+
+    # Open memory maps keep the old file readable after unlink on POSIX.
+    if previous and previous.get("path") not in (None, path):
+        try:
+            os.remove(previous["path"])
+        except OSError:
+            pass
+
+
+def get_or_build_frame(name: str, version: str, build) -> pd.DataFrame:
+    df = get_frame(name, version)
+    if df is not None:
+        return df
+
+    with locked(name):
+        df = get_frame(name, version)
+        if df is None:
+            df = build()
+            try:
+                put_frame(name, version, df)
+            except (OSError, pa.ArrowException):
+                pass
+    return df
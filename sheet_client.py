@@ -0,0 +1,294 @@
+import csv
+import hashlib
+import io
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ==========================
+# Shared HTTP client for sheet downloads
+# ==========================
+# One pooled requests.Session per process: keep-alive connections to the
+# sheets host, gzip/deflate negotiation, bounded timeouts and exponential
+# backoff on transient failures. urllib3 only retries 429/5xx answers;
+# connection errors and timeouts are retried by fetch_bytes, which counts
+# every failed attempt toward the source's circuit breaker, so an outage
+# opens it after FAILURE_THRESHOLD timeouts rather than that many fully
+# retried fetches.
+
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 10
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.5
+POOL_SIZE = 8
+CHUNK_SIZE = 64 * 1024
+
+# A source that fails FAILURE_THRESHOLD times in a row is opened: further
+# fetches fail fast and a background probe retries every PROBE_INTERVAL
+# seconds until the source answers again.
+FAILURE_THRESHOLD = 3
+PROBE_INTERVAL = 30
+
+LAST_KNOWN_GOOD_DIR = os.path.join(".cache", "last_known_good")
+
+_session = None
+_session_lock = threading.Lock()
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+_last_known_good = {}
+_last_known_good_lock = threading.Lock()
+
+
+class SourceUnavailable(Exception):
+    pass
+
+
+def make_session() -> requests.Session:
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=0,
+        read=0,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "Accept": "text/csv"})
+    return session
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = make_session()
+    return _session
+
+
+def download(url: str, session: requests.Session = None) -> bytes:
+    session = session or get_session()
+    with session.get(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), stream=True) as resp:
+        resp.raise_for_status()
+        # iter_content decodes gzip/deflate as the body streams in.
+        return b"".join(resp.iter_content(CHUNK_SIZE))
+
+
+def fetch_bytes(url: str, session: requests.Session = None) -> bytes:
+    breaker = get_breaker(source_key(url))
+    for attempt in range(MAX_RETRIES + 1):
+        breaker.check()
+        try:
+            raw = download(url, session)
+        except requests.RequestException as e:
+            if breaker.record_failure():
+                start_probe(url, breaker)
+            transient = isinstance(e, (requests.ConnectionError, requests.Timeout))
+            if not transient or attempt == MAX_RETRIES or breaker.is_open:
+                raise
+            time.sleep(BACKOFF_FACTOR * 2 ** attempt)
+            continue
+
+        breaker.record_success()
+        save_last_known_good(url, raw)
+        return raw
+
+
+# ==========================
+# Circuit breaker
+# ==========================
+
+def source_key(url: str) -> str:
+    # Planned gviz queries of one sheet share that sheet's breaker.
+    return url.split("&tq=", 1)[0]
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, threshold: int = FAILURE_THRESHOLD):
+        self.name = name
+        self.threshold = threshold
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def check(self):
+        if self.is_open:
+            raise SourceUnavailable(f"{self.name} is unavailable since {self.opened_at:%Y-%m-%d %H:%M:%S} UTC")
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> bool:
+        # Returns True when this failure opened the breaker.
+        with self.lock:
+            self.failures += 1
+            if self.opened_at is None and self.failures >= self.threshold:
+                self.opened_at = datetime.now(timezone.utc)
+                return True
+            return False
+
+
+def get_breaker(key: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(key)
+        return _breakers[key]
+
+
+def start_probe(url: str, breaker: CircuitBreaker):
+    with breaker.lock:
+        if breaker.probing:
+            return
+        breaker.probing = True
+
+    def probe():
+        while True:
+            time.sleep(PROBE_INTERVAL)
+            try:
+                raw = download(url)
+            except requests.RequestException:
+                continue
+            save_last_known_good(url, raw)
+            with breaker.lock:
+                breaker.probing = False
+            breaker.record_success()
+            return
+
+    threading.Thread(target=probe, name=f"probe-{breaker.name[-24:]}", daemon=True).start()
+
+
+# ==========================
+# Last-known-good snapshots
+# ==========================
+# The last successful download of every URL is kept in memory and on disk, so
+# a restart during an outage can still serve data.
+
+def last_known_good_path(url: str) -> str:
+    return os.path.join(LAST_KNOWN_GOOD_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".csv")
+
+
+def save_last_known_good(url: str, raw: bytes):
+    with _last_known_good_lock:
+        previous = _last_known_good.get(url)
+        _last_known_good[url] = (raw, datetime.now(timezone.utc))
+    try:
+        if previous is not None and previous[0] == raw:
+            os.utime(last_known_good_path(url))
+            return
+        os.makedirs(LAST_KNOWN_GOOD_DIR, exist_ok=True)
+        path = last_known_good_path(url)
+        with open(path + ".tmp", "wb") as f:
+            f.write(raw)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+
+def last_known_good(url: str):
+    # Returns (raw bytes, as-of datetime) or None.
+    with _last_known_good_lock:
+        if url in _last_known_good:
+            return _last_known_good[url]
+
+    path = last_known_good_path(url)
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        as_of = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+    except OSError:
+        return None
+
+    with _last_known_good_lock:
+        _last_known_good.setdefault(url, (raw, as_of))
+    return raw, as_of
+
+
+# ==========================
+# CSV ingest
+# ==========================
+# Sheets are parsed by pyarrow against a declared schema: every selected column
+# is read as a string with NA sentinels nulled at parse time, then "text"
+# columns are stripped, "bool" columns mapped through TRUE_TOKENS and
+# "percent" columns turned into floats, each in one vectorized pass.
+
+NA_SENTINELS = ["", "nan", "NaN", "NAN", "none", "None", "NONE", "null", "Null", "NULL"]
+TRUE_TOKENS = ["true", "yes", "1", "✓", "✔", "✅", "done"]
+
+
+def dedupe_columns(names: list) -> list:
+    # Same naming pandas uses for repeated headers: Content, Content.1, ...
+    seen = {}
+    out = []
+    for name in names:
+        if name in seen:
+            seen[name] += 1
+            out.append(f"{name}.{seen[name]}")
+        else:
+            seen[name] = 0
+            out.append(name)
+    return out
+
+
+def read_header(raw: bytes) -> list:
+    text = io.TextIOWrapper(io.BytesIO(raw), encoding="utf-8-sig", newline="")
+    names = next(csv.reader(text), [])
+    return dedupe_columns([c.strip() or f"Unnamed: {i}" for i, c in enumerate(names)])
+
+
+def to_bool(col: pd.Series) -> pd.Series:
+    return col.fillna("").str.strip().str.lower().isin(TRUE_TOKENS)
+
+
+def to_percent(col: pd.Series) -> pd.Series:
+    return pd.to_numeric(col.str.replace("%", "", regex=False).str.strip(), errors="coerce")
+
+
+def read_sheet_csv(raw: bytes, schema: dict, project: bool = True) -> pd.DataFrame:
+    header = read_header(raw)
+    if not header:
+        return pd.DataFrame()
+
+    include = [c for c in header if c in schema] if project else header
+    table = pacsv.read_csv(
+        io.BytesIO(raw),
+        read_options=pacsv.ReadOptions(column_names=header, skip_rows=1),
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: pa.string() for c in include},
+            include_columns=include,
+            null_values=NA_SENTINELS,
+            strings_can_be_null=True,
+        ),
+    )
+    df = table.to_pandas()
+
+    for c, kind in schema.items():
+        if c not in df.columns:
+            continue
+        if kind == "text":
+            df[c] = df[c].fillna("").str.strip()
+        elif kind == "bool":
+            df[c] = to_bool(df[c])
+        elif kind == "percent":
+            df[c] = to_percent(df[c])
+    return df
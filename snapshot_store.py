@@ -0,0 +1,221 @@
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# ==========================
+# Progress history
+# ==========================
+# Append-only SQLite table of per-course progress. Every time a new data
+# version of the courses sheet is built, the courses whose Progress %, block
+# completion or Development Stage differ from their latest snapshot get a new
+# row; unchanged courses are not rewritten. A course that is no longer in a
+# semester the new version contains gets an end marker (its last values with
+# removed = 1), and a new row if it comes back later. Indexes on (semester,
+# time) and (course, time) keep time-range queries off full scans.
+#
+# Trends are computed "as of": at every snapshot time a course counts with its
+# latest known values until its end marker, so sparse history still gives
+# continuous lines and deleted or moved courses stop counting.
+
+HISTORY_PATH = os.environ.get("HTU_HISTORY_PATH", os.path.join(".cache", "progress_history.sqlite"))
+
+TASK_COUNT = 16  # Detailed Outline + 15 blocks
+KEY_COLS = ["semester_key", "school", "course_key"]
+VALUE_COLS = ["course", "stage", "progress", "blocks_done", "outline_done"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    taken_at TEXT NOT NULL,
+    data_version TEXT NOT NULL,
+    semester_key TEXT NOT NULL,
+    school TEXT NOT NULL,
+    course_key TEXT NOT NULL,
+    course TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    progress REAL NOT NULL,
+    blocks_done INTEGER NOT NULL,
+    outline_done INTEGER NOT NULL,
+    removed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS snapshots_semester_time ON snapshots (semester_key, taken_at);
+CREATE INDEX IF NOT EXISTS snapshots_course_time ON snapshots (course_key, taken_at);
+CREATE INDEX IF NOT EXISTS snapshots_key ON snapshots (semester_key, school, course_key, id);
+CREATE TABLE IF NOT EXISTS versions (
+    data_version TEXT PRIMARY KEY,
+    recorded_at TEXT NOT NULL
+);
+"""
+
+
+def to_utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def connect(path: str = None) -> sqlite3.Connection:
+    path = path or HISTORY_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    # Histories written before end markers existed lack the column.
+    if "removed" not in {row[1] for row in conn.execute("PRAGMA table_info(snapshots)")}:
+        conn.execute("ALTER TABLE snapshots ADD COLUMN removed INTEGER NOT NULL DEFAULT 0")
+    return conn
+
+
+def filled(col: pd.Series) -> pd.Series:
+    return ~col.fillna("").astype(str).str.strip().str.lower().isin(["", "nan", "none", "null"])
+
+
+def snapshot_rows(df: pd.DataFrame) -> pd.DataFrame:
+    blocks = [f"Block {i}" for i in range(1, 16) if f"Block {i}" in df.columns]
+    out = pd.DataFrame({
+        "semester_key": df["__semester_key__"],
+        "school": df["School"].fillna(""),
+        "course_key": df["__course_key__"],
+        "course": df["Course \\ pathway"].fillna(""),
+        "stage": df["Development Stage"].fillna(""),
+        "progress": df["Progress %"].astype(float).round(4),
+        "blocks_done": sum(filled(df[b]).astype(int) for b in blocks) if blocks else 0,
+        "outline_done": filled(df["Detailed Outline"]).astype(int),
+        "removed": 0,
+    })
+    out = out[(out["course_key"] != "") & (out["semester_key"] != "")]
+    return out.drop_duplicates(KEY_COLS, keep="last")
+
+
+def latest_rows(conn: sqlite3.Connection, semester_keys: list) -> pd.DataFrame:
+    marks = ",".join("?" * len(semester_keys))
+    return pd.read_sql_query(
+        f"""
+        SELECT s.semester_key, s.school, s.course_key, s.course, s.stage,
+               s.progress, s.blocks_done, s.outline_done, s.removed
+        FROM snapshots s
+        JOIN (
+            SELECT MAX(id) AS id FROM snapshots
+            WHERE semester_key IN ({marks})
+            GROUP BY semester_key, school, course_key
+        ) latest ON latest.id = s.id
+        """,
+        conn,
+        params=semester_keys,
+    )
+
+
+def record_snapshot(df: pd.DataFrame, version: str, path: str = None) -> int:
+    # Appends the courses that changed since their latest snapshot and end
+    # markers for the courses gone from their semester; returns the number of
+    # rows written. A data version is only ever recorded once.
+    rows = snapshot_rows(df)
+    taken_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    with closing(connect(path)) as conn, conn:
+        seen = conn.execute("SELECT 1 FROM versions WHERE data_version = ?", (version,)).fetchone()
+        if seen or rows.empty:
+            return 0
+
+        previous = latest_rows(conn, rows["semester_key"].unique().tolist())
+        if not previous.empty:
+            merged = rows.merge(previous, on=KEY_COLS, how="left", suffixes=("", "_prev"), indicator=True)
+            changed = merged["_merge"] == "left_only"
+            for c in VALUE_COLS + ["removed"]:
+                changed |= merged[c] != merged[f"{c}_prev"]
+
+            gone = previous.merge(rows[KEY_COLS], on=KEY_COLS, how="left", indicator=True)
+            gone = gone[(gone["_merge"] == "left_only") & (gone["removed"] == 0)]
+            rows = pd.concat([rows[changed.to_numpy()], gone.drop(columns="_merge").assign(removed=1)], ignore_index=True)
+
+        rows = rows.assign(taken_at=taken_at, data_version=version)
+        rows.to_sql("snapshots", conn, if_exists="append", index=False)
+        conn.execute("INSERT INTO versions (data_version, recorded_at) VALUES (?, ?)", (version, taken_at))
+    return len(rows)
+
+
+def query_snapshots(start: datetime = None, end: datetime = None, semester_key: str = None,
+                    course_key: str = None, path: str = None) -> pd.DataFrame:
+    where, params = [], []
+    if semester_key is not None:
+        where.append("semester_key = ?")
+        params.append(semester_key)
+    if course_key is not None:
+        where.append("course_key = ?")
+        params.append(course_key)
+    if start is not None:
+        where.append("taken_at >= ?")
+        params.append(to_utc(start).isoformat(timespec="seconds"))
+    if end is not None:
+        where.append("taken_at <= ?")
+        params.append(to_utc(end).isoformat(timespec="seconds"))
+
+    sql = "SELECT * FROM snapshots"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY taken_at, id"
+
+    with closing(connect(path)) as conn:
+        df = pd.read_sql_query(sql, conn, params=params)
+    df["taken_at"] = pd.to_datetime(df["taken_at"], utc=True)
+    return df
+
+
+def version_days(end: datetime = None, path: str = None) -> pd.DatetimeIndex:
+    # Distinct UTC days on which a new data version was recorded.
+    sql, params = "SELECT recorded_at FROM versions", []
+    if end is not None:
+        sql += " WHERE recorded_at <= ?"
+        params.append(to_utc(end).isoformat(timespec="seconds"))
+
+    with closing(connect(path)) as conn:
+        recorded = pd.read_sql_query(sql, conn, params=params)["recorded_at"]
+    return pd.DatetimeIndex(pd.to_datetime(recorded, utc=True).dt.floor("D").unique()).sort_values()
+
+
+# ==========================
+# Trends
+# ==========================
+
+def as_of_frame(history: pd.DataFrame, value: str, freq: str, end=None) -> pd.DataFrame:
+    # time bucket x (school, course) with every course's latest value carried
+    # forward (through `end` when given) and NaN from its end marker on
+    def carried(col):
+        wide = history.pivot_table(index="taken_at", columns=["school", "course_key"], values=col, aggfunc="last")
+        wide = wide.resample(freq).last()
+        if end is not None:
+            wide = wide.reindex(pd.date_range(wide.index[0], to_utc(end).floor(freq), freq=freq))
+        return wide.ffill()
+
+    return carried(value).mask(carried("removed").fillna(0).astype(bool))
+
+
+def progress_trend(semester_key: str, start: datetime = None, end: datetime = None,
+                   freq: str = "D", path: str = None) -> pd.DataFrame:
+    # Mean Progress % per school (columns) and overall per time bucket.
+    history = query_snapshots(end=end, semester_key=semester_key, path=path)
+    if history.empty:
+        return pd.DataFrame()
+
+    wide = as_of_frame(history, "progress", freq)
+    trend = wide.T.groupby(level="school").mean().T
+    trend["Overall"] = wide.mean(axis=1)
+    if start is not None:
+        trend = trend[trend.index >= to_utc(start).floor(freq)]
+    return trend
+
+
+def burndown(semester_key: str, start: datetime = None, end: datetime = None,
+             freq: str = "D", path: str = None) -> pd.Series:
+    # Outline and block tasks still open across the semester's courses.
+    history = query_snapshots(end=end, semester_key=semester_key, path=path)
+    if history.empty:
+        return pd.Series(dtype=float)
+
+    history = history.assign(remaining=TASK_COUNT - history["blocks_done"] - history["outline_done"])
+    remaining = as_of_frame(history, "remaining", freq).sum(axis=1)
+    if start is not None:
+        remaining = remaining[remaining.index >= to_utc(start).floor(freq)]
+    return remaining
@@ -0,0 +1,119 @@
+import pandas as pd
+import pytest
+
+import course_query
+from course_query import QueryError, parse_query, search_courses
+from htu_core import SEARCHABLE_COLS, TASK_COLUMNS, normalize_semester_label
+
+COURSES = [
+    # course, school, SMEs, notes, stage, progress, filled task columns
+    ("Intro to AI", "SET", "Ahmad Ali", "", "Production", 80.0, ["Detailed Outline", "Block 1", "Block 7"]),
+    ("Children's Literature", "SLA", "Sara O'Brien", "delayed by SME", "Design", 20.0, ["Detailed Outline"]),
+    ("Data Structures", "SET", "Omar K", "Note: waiting on labs", "Planning", 0.0, []),
+    ("Circuits", "SEE", "Ahmad Ali", "see https://lms.example/circuits", "Production", 50.0, ["Block 7"]),
+]
+
+
+@pytest.fixture
+def df():
+    rows = []
+    for course, school, smes, notes, stage, progress, done in COURSES:
+        row = {
+            "Semester": "Fall 2025/2026",
+            "School": school,
+            "Department": "Dept",
+            "Course \\ pathway": course,
+            "Development Stage": stage,
+            "Dept. Head": "",
+            "SMEs": smes,
+            "ID": "",
+            "Notes": notes,
+            "Progress %": progress,
+        }
+        row.update({c: ("x" if c in done else "") for c in TASK_COLUMNS})
+        rows.append(row)
+    df = pd.DataFrame(rows)
+    df["__semester_key__"] = df["Semester"].apply(normalize_semester_label)
+    df["__search_text__"] = df[SEARCHABLE_COLS[0]].str.cat(df[SEARCHABLE_COLS[1:]], sep=" | ").str.lower()
+    return df
+
+
+def courses(df, query):
+    return list(search_courses(df, query)["Course \\ pathway"])
+
+
+def test_apostrophes_are_plain_text(df):
+    assert parse_query("Children's") == ((("text", None, "contains", "children's", False),),)
+    assert courses(df, "children's") == ["Children's Literature"]
+    assert courses(df, "O'Brien") == ["Children's Literature"]
+
+
+def test_plain_words_are_one_phrase(df):
+    assert parse_query("intro to ai") == ((("text", None, "contains", "intro to ai", False),),)
+    assert courses(df, "intro to ai") == ["Intro to AI"]
+    assert courses(df, "ai intro") == []
+
+
+def test_unknown_field_prefix_is_text(df):
+    assert courses(df, "Note: waiting") == ["Data Structures"]
+    assert courses(df, "https://lms.example") == ["Circuits"]
+
+
+def test_double_quotes_group_words(df):
+    assert parse_query('sme:"ahmad ali"') == ((("text", "sme", "contains", "ahmad ali", False),),)
+    assert courses(df, 'sme:"ahmad ali" school:SET') == ["Intro to AI"]
+    # An unclosed quote runs to the end of the query.
+    assert courses(df, '"intro to') == ["Intro to AI"]
+
+
+def test_or_groups(df):
+    assert len(parse_query("school:SLA OR school:SEE")) == 2
+    assert courses(df, "school:SLA OR school:SEE") == ["Children's Literature", "Circuits"]
+    assert courses(df, "ahmad school:SET OR delayed") == ["Intro to AI", "Children's Literature"]
+
+
+def test_negation(df):
+    assert courses(df, "-school:SET") == ["Children's Literature", "Circuits"]
+    assert courses(df, "ahmad -production") == []
+    assert courses(df, "stage!=production") == ["Children's Literature", "Data Structures"]
+
+
+def test_block_and_outline(df):
+    assert courses(df, "block:7=done") == ["Intro to AI", "Circuits"]
+    assert courses(df, "block:7") == ["Intro to AI", "Circuits"]
+    assert courses(df, "outline:todo") == ["Data Structures", "Circuits"]
+    assert courses(df, "outline: block:1=todo") == ["Children's Literature"]
+    with pytest.raises(QueryError):
+        parse_query("block:16=done")
+    with pytest.raises(QueryError):
+        parse_query("block:3=maybe")
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("progress<50", ["Children's Literature", "Data Structures"]),
+    ("progress<=50", ["Children's Literature", "Data Structures", "Circuits"]),
+    ("progress>50", ["Intro to AI"]),
+    ("progress>=80%", ["Intro to AI"]),
+    ("progress=0", ["Data Structures"]),
+    ("progress!=0", ["Intro to AI", "Children's Literature", "Circuits"]),
+    ("blocks>=2", ["Intro to AI"]),
+    ("blocks:1", ["Circuits"]),
+])
+def test_numeric_ops(df, query, expected):
+    assert courses(df, query) == expected
+
+
+def test_regex_and_exact_text(df):
+    assert courses(df, "notes:~delay|waiting") == ["Children's Literature", "Data Structures"]
+    assert courses(df, "stage:=production") == ["Intro to AI", "Circuits"]
+    with pytest.raises(QueryError):
+        parse_query("notes:~(")
+    with pytest.raises(QueryError):
+        parse_query("progress<abc")
+
+
+def test_query_mask_matches_all_rows_for_empty_query(df):
+    index = course_query.build_index(df)
+    assert course_query.query_mask(index, "   ").all()
+    mask = course_query.query_mask(index, "school:SET")
+    assert mask.tolist() == [True, False, True, False]
@@ -0,0 +1,116 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import forecast
+import htu_core
+import snapshot_store
+
+TODAY = pd.Timestamp("2026-03-10", tz="UTC")
+
+
+def sheet(progress: dict):
+    # progress: (school, course) -> Progress %
+    df = pd.DataFrame(
+        [(school, course, value) for (school, course), value in progress.items()],
+        columns=["School", "Course \\ pathway", "Progress %"],
+    )
+    df["__semester_key__"] = "spring 2025/2026"
+    df["__course_key__"] = df["Course \\ pathway"].str.lower()
+    df["Development Stage"] = "Production"
+    df["Detailed Outline"] = ""
+    return df
+
+
+def record(path, version, day, progress):
+    snapshot_store.record_snapshot(sheet(progress), version, path)
+    stamp = f"{day}T12:00:00+00:00"
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE snapshots SET taken_at = ? WHERE data_version = ?", (stamp, version))
+        conn.execute("UPDATE versions SET recorded_at = ? WHERE data_version = ?", (stamp, version))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "history.sqlite")
+
+
+def test_fit_rates_slope_and_sample_gate():
+    y = np.array([[10.0, 50.0, np.nan], [20.0, 50.0, np.nan], [30.0, 50.0, 5.0]])
+    slope, n = forecast.fit_rates(y)
+    assert slope[0] == pytest.approx(10.0)
+    assert slope[1] == 0.0
+    assert np.isnan(slope[2])
+    assert n.tolist() == [3, 3, 1]
+
+    slope, _ = forecast.fit_rates(y, samples=np.array([2, 3, 3]))
+    assert np.isnan(slope[0])
+    assert slope[1] == 0.0
+
+
+def test_classify():
+    current = np.array([100.0, 40.0, 40.0, 40.0, 40.0])
+    slope = np.array([0.0, np.nan, 0.0, 1.0, 10.0])
+    finish = forecast.project_finish(current, slope, TODAY)
+    status = forecast.classify(current, slope, finish, TODAY + pd.Timedelta(days=30))
+    assert status.tolist() == [
+        forecast.STATUS_DONE, forecast.STATUS_UNKNOWN, forecast.STATUS_STALLED,
+        forecast.STATUS_LATE, forecast.STATUS_ON_TRACK,
+    ]
+    assert finish[4] == TODAY + pd.Timedelta(days=6)
+    assert forecast.classify(current, slope, finish, None)[3] == forecast.STATUS_ON_TRACK
+
+
+def test_unchanged_course_is_stalled(path):
+    # AI never changes, so it only has its first snapshot row; the versions
+    # recorded for DB still count as days it was observed.
+    for i, day in enumerate(["2026-03-01", "2026-03-03", "2026-03-05", "2026-03-07"]):
+        record(path, f"v{i}", day, {("SCI", "AI"): 40.0, ("SCI", "DB"): 10.0 + 10 * i})
+
+    courses = forecast.forecast_semester("spring 2025/2026", today=TODAY, path=path)["courses"].set_index("course")
+    assert courses.loc["AI", "samples"] == 4
+    assert courses.loc["AI", "status"] == forecast.STATUS_STALLED
+    assert courses.loc["AI", "at_risk"]
+    assert courses.loc["DB", "status"] == forecast.STATUS_ON_TRACK
+
+
+def test_late_and_short_history(path):
+    record(path, "v0", "2026-03-01", {("SCI", "AI"): 10.0})
+    record(path, "v1", "2026-03-04", {("SCI", "AI"): 13.0})
+    record(path, "v2", "2026-03-07", {("SCI", "AI"): 16.0, ("ENG", "NEW"): 5.0})
+    record(path, "v3", "2026-03-09", {("SCI", "AI"): 18.0, ("ENG", "NEW"): 5.0, ("ENG", "X"): 1.0})
+
+    result = forecast.forecast_semester("spring 2025/2026", deadline="2026-04-01", today=TODAY, path=path)
+    courses = result["courses"].set_index("course")
+    assert courses.loc["AI", "status"] == forecast.STATUS_LATE
+    assert courses.loc["NEW", "samples"] == 2
+    assert courses.loc["NEW", "status"] == forecast.STATUS_UNKNOWN
+
+    schools = result["schools"].set_index("school")
+    assert schools.loc["SCI", "status"] == forecast.STATUS_LATE
+    assert schools.loc["ENG", "courses"] == 2
+
+
+def test_days_before_the_window_count_once(path):
+    record(path, "v0", "2026-01-01", {("SCI", "AI"): 10.0})
+    record(path, "v1", "2026-01-02", {("SCI", "AI"): 11.0})
+    record(path, "v2", "2026-03-08", {("SCI", "AI"): 12.0})
+
+    courses = forecast.forecast_semester("spring 2025/2026", today=TODAY, path=path)["courses"]
+    assert courses["samples"].tolist() == [2]
+    assert courses["status"].tolist() == [forecast.STATUS_UNKNOWN]
+
+
+def test_empty_history(path):
+    result = forecast.forecast_semester("spring 2025/2026", today=TODAY, path=path)
+    assert result["courses"].empty and result["schools"].empty
+
+
+def test_semester_deadline_defaults_to_term_start(monkeypatch):
+    assert htu_core.semester_deadline("fall 2025/2026") == "2025-09-01"
+    assert htu_core.semester_deadline("spring 2025/2026") == "2026-02-01"
+    assert htu_core.semester_deadline("unknown") is None
+    monkeypatch.setitem(htu_core.SEMESTER_DEADLINES, "fall 2025/2026", "2025-10-15")
+    assert htu_core.semester_deadline("fall 2025/2026") == "2025-10-15"
@@ -0,0 +1,84 @@
+import io
+import re
+import threading
+import urllib.request
+
+import pandas as pd
+import pytest
+
+import gviz_emulator
+import htu_core
+
+SHEET_CSV = """Semester,School,Department,Course \\ pathway,SMEs,Notes
+Spring 2024/2025,SCI,CS,Intro to AI,Ahmad Ali,
+spring 24/25,SCI,CS,Data Structures,Sara Omar,late
+Fall  2025-2026,ENG,EE,Circuits,Omar K,
+Spring 2025/2026,ENG,ME,Statics,Lina Haddad,
+"""
+
+
+def fetch(url: str) -> bytes:
+    with urllib.request.urlopen(url, timeout=10) as resp:
+        return resp.read()
+
+
+@pytest.fixture
+def sheet_url(tmp_path):
+    path = tmp_path / "courses.csv"
+    path.write_text(SHEET_CSV, encoding="utf-8")
+    server = gviz_emulator.make_server({"test": str(path)}, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/spreadsheets/d/test/gviz/tq?tqx=out:csv"
+    server.shutdown()
+
+
+def read(url: str) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(fetch(url)), dtype=str, keep_default_na=False)
+
+
+def test_semester_pattern_matches_aliases_and_separators():
+    pattern = htu_core.semester_match_pattern(("spring 2024/2025",))
+    assert re.fullmatch(pattern, "spring 2024/2025")
+    assert re.fullmatch(pattern, " spring-  2024/2025 ")
+    assert re.fullmatch(pattern, "spring 24/25")
+    assert not re.fullmatch(pattern, "spring 2025/2026")
+
+
+def test_build_gviz_query_projects_columns_in_sheet_order():
+    header = ["Semester", "School", "Unused", "Course \\ pathway", "Notes"]
+    assert htu_core.build_gviz_query(header) == "select *"
+    assert htu_core.build_gviz_query(header, ["Notes", "Semester"]) == "select A, E"
+    # Any spelling of the course column selects whichever one the sheet has.
+    assert htu_core.build_gviz_query(header, ["Course / pathway"]) == "select D"
+    assert htu_core.build_gviz_query(header, ["Missing"]) == "select *"
+
+
+def test_build_gviz_query_filters_on_semester_column():
+    query = htu_core.build_gviz_query(["School", "Semester"], ["School"], ("fall 2025/2026",))
+    assert query.startswith("select A where lower(B) matches '")
+    assert htu_core.build_gviz_query(["School"], None, ("fall 2025/2026",)) == "select *"
+
+
+def test_plan_sheet_url_pushes_projection_and_filter(sheet_url):
+    url = htu_core.plan_sheet_url(sheet_url, ["Semester", "Course \\ pathway"], ("spring 2024/2025",), fetch)
+    df = read(url)
+    assert list(df.columns) == ["Semester", "Course \\ pathway"]
+    assert list(df["Course \\ pathway"]) == ["Intro to AI", "Data Structures"]
+
+
+def test_plan_sheet_url_keeps_plain_url_when_nothing_to_push(sheet_url):
+    assert htu_core.plan_sheet_url(sheet_url, fetch=fetch) == sheet_url
+    assert len(read(sheet_url)) == 4
+
+
+def test_plan_sheet_url_falls_back_when_header_fetch_fails(sheet_url):
+    def failing(url):
+        raise OSError("unreachable")
+
+    assert htu_core.plan_sheet_url(sheet_url, ["School"], ("fall 2025/2026",), failing) == sheet_url
+
+
+def test_fetch_column_values_lists_every_semester(sheet_url):
+    values = htu_core.fetch_column_values(sheet_url, "Semester", fetch)
+    assert values == ["Fall  2025-2026", "Spring 2024/2025", "Spring 2025/2026", "spring 24/25"]
+    assert htu_core.fetch_column_values(sheet_url, "Missing", fetch) == []
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+import htu_api
+import htu_core
+
+
+@pytest.fixture
+def snapshot():
+    df = pd.DataFrame({
+        "Semester": ["Spring 2024/2025"],
+        "School": ["SCI"],
+        "Department": ["CS"],
+        "Course \\ pathway": ["Intro to AI"],
+        "SMEs": ["Ahmad Ali"],
+        "Progress %": [50.0],
+    })
+    df_tlc = pd.DataFrame({
+        "Instructor Name": ["Sara Omar"],
+        "Session 1": [True],
+        "Session 2": [False],
+    })
+    df_tlc["__name_key__"] = df_tlc["Instructor Name"].map(htu_core.normalize_person_name)
+    return {"df": df, "df_tlc": df_tlc}
+
+
+def test_unknown_instructor_is_not_found(snapshot):
+    with pytest.raises(htu_api.NotFound):
+        htu_api.instructor_payload(snapshot, "Nobody Here")
+
+
+def test_instructor_without_tlc_row_has_no_sessions(snapshot):
+    payload = htu_api.instructor_payload(snapshot, "Ahmad Ali")
+    assert [c["course"] for c in payload["courses"]] == ["Intro to AI"]
+    assert payload["tlc_sessions"] == {}
+    assert payload["tlc_total"] == 0
+
+
+def test_instructor_with_tlc_row_only(snapshot):
+    payload = htu_api.instructor_payload(snapshot, "Sara Omar")
+    assert payload["courses"] == []
+    assert payload["tlc_sessions"] == {"Session 1": True, "Session 2": False}
+    assert payload["tlc_completed"] == 1
+    assert payload["tlc_total"] == 2
+
+
+def test_tlc_counts_are_zero_without_a_match(snapshot):
+    counts = htu_core.instructor_tlc_counts(["Ahmad Ali", "Sara Omar"], snapshot["df_tlc"]).set_index("instructor")
+    assert counts.loc["Ahmad Ali", "tlc_total"] == 0
+    assert counts.loc["Ahmad Ali", "tlc_completed"] == 0
+    assert counts.loc["Sara Omar", "tlc_total"] == 2
+    assert counts.loc["Sara Omar", "tlc_completed"] == 1
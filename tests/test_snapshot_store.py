@@ -0,0 +1,76 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import snapshot_store
+
+
+def sheet(rows):
+    # rows: (semester key, school, course, progress)
+    df = pd.DataFrame(rows, columns=["__semester_key__", "School", "Course \\ pathway", "Progress %"])
+    df["__course_key__"] = df["Course \\ pathway"].str.lower()
+    df["Development Stage"] = "Design"
+    df["Detailed Outline"] = ""
+    return df
+
+
+def taken(path, version, day):
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE snapshots SET taken_at = ? WHERE data_version = ?", (f"{day}T12:00:00+00:00", version))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "history.sqlite")
+
+
+def test_unchanged_courses_are_not_rewritten(path):
+    df = sheet([("s1", "SCI", "AI", 10.0), ("s1", "SCI", "DB", 20.0)])
+    assert snapshot_store.record_snapshot(df, "v1", path) == 2
+    assert snapshot_store.record_snapshot(df, "v1", path) == 0
+    df.loc[0, "Progress %"] = 15.0
+    assert snapshot_store.record_snapshot(df, "v2", path) == 1
+
+
+def test_deleted_course_gets_an_end_marker(path):
+    snapshot_store.record_snapshot(sheet([("s1", "SCI", "AI", 10.0), ("s1", "SCI", "DB", 20.0)]), "v1", path)
+    assert snapshot_store.record_snapshot(sheet([("s1", "SCI", "AI", 10.0)]), "v2", path) == 1
+    # the marker is written once, and a course that comes back is recorded again
+    assert snapshot_store.record_snapshot(sheet([("s1", "SCI", "AI", 12.0)]), "v3", path) == 1
+    assert snapshot_store.record_snapshot(sheet([("s1", "SCI", "AI", 12.0), ("s1", "SCI", "DB", 25.0)]), "v4", path) == 1
+
+    history = snapshot_store.query_snapshots(course_key="db", path=path)
+    assert history["removed"].tolist() == [0, 1, 0]
+    assert history["progress"].tolist() == [20.0, 20.0, 25.0]
+
+
+def test_other_semesters_keep_their_courses(path):
+    snapshot_store.record_snapshot(sheet([("s1", "SCI", "AI", 10.0), ("s2", "SCI", "DB", 20.0)]), "v1", path)
+    assert snapshot_store.record_snapshot(sheet([("s1", "SCI", "AI", 30.0)]), "v2", path) == 1
+    assert snapshot_store.query_snapshots(semester_key="s2", path=path)["removed"].tolist() == [0]
+
+
+def test_moved_course_stops_counting_in_its_old_school(path):
+    snapshot_store.record_snapshot(sheet([("s1", "SCI", "AI", 10.0), ("s1", "SCI", "DB", 50.0)]), "v1", path)
+    taken(path, "v1", "2026-03-01")
+    snapshot_store.record_snapshot(sheet([("s1", "SCI", "AI", 10.0), ("s1", "ENG", "DB", 50.0)]), "v2", path)
+    taken(path, "v2", "2026-03-03")
+
+    trend = snapshot_store.progress_trend("s1", path=path)
+    assert trend.loc["2026-03-02", "SCI"] == 30.0
+    assert trend.loc["2026-03-03", "SCI"] == 10.0
+    assert trend.loc["2026-03-03", "ENG"] == 50.0
+    assert trend.loc["2026-03-03", "Overall"] == 30.0
+
+
+def test_history_without_end_markers_is_migrated(path):
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE snapshots (id INTEGER PRIMARY KEY AUTOINCREMENT, taken_at TEXT NOT NULL,"
+            " data_version TEXT NOT NULL, semester_key TEXT NOT NULL, school TEXT NOT NULL,"
+            " course_key TEXT NOT NULL, course TEXT NOT NULL, stage TEXT NOT NULL, progress REAL NOT NULL,"
+            " blocks_done INTEGER NOT NULL, outline_done INTEGER NOT NULL)"
+        )
+    assert snapshot_store.record_snapshot(sheet([("s1", "SCI", "AI", 10.0)]), "v1", path) == 1
+    assert snapshot_store.query_snapshots(path=path)["removed"].tolist() == [0]